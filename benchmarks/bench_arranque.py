@@ -0,0 +1,61 @@
+"""Benchmark de arranque: tiempo de `import` de las bibliotecas de cálculo en un intérprete nuevo.
+
+Uso:
+    python benchmarks/bench_arranque.py [--repeticiones 20] [--max-ms 50]
+
+Cada medición lanza un proceso limpio, de modo que cuenta el costo real de un arranque en
+frío. También verifica que importar el motor no arrastre streamlit, pandas ni altair.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULOS = ("nomina_motor", "nomina_lote")
+PESADOS = ("streamlit", "pandas", "altair")
+
+_SONDA = """
+import sys, time
+t0 = time.perf_counter()
+import {modulo}
+ms = (time.perf_counter() - t0) * 1000
+print(ms, ",".join(m for m in {pesados!r} if m in sys.modules))
+"""
+
+
+def medir_import(modulo, repeticiones):
+    tiempos, pesados = [], ""
+    for _ in range(repeticiones):
+        salida = subprocess.run(
+            [sys.executable, "-c", _SONDA.format(modulo=modulo, pesados=PESADOS)],
+            cwd=RAIZ, capture_output=True, text=True, check=True,
+        ).stdout.split()
+        tiempos.append(float(salida[0]))
+        pesados = salida[1] if len(salida) > 1 else ""
+    return {"modulo": modulo, "mediana_ms": statistics.median(tiempos), "min_ms": min(tiempos),
+            "importa_pesados": pesados.split(",") if pesados else []}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--max-ms", type=float, default=None, help="Falla si nomina_motor tarda más (mediana)")
+    args = parser.parse_args(argv)
+
+    resultados = [medir_import(m, args.repeticiones) for m in MODULOS]
+    for r in resultados:
+        print(json.dumps(r, ensure_ascii=False))
+
+    motor = resultados[0]
+    if motor["importa_pesados"]:
+        print(f"ERROR: nomina_motor importa {motor['importa_pesados']}", file=sys.stderr)
+        return 1
+    if args.max_ms is not None and motor["mediana_ms"] > args.max_ms:
+        print(f"ERROR: import de nomina_motor {motor['mediana_ms']:.2f} ms > {args.max_ms} ms", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
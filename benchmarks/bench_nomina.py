@@ -0,0 +1,154 @@
+"""Suite de benchmarks: motor escalar, nómina por lotes, reruns de la interfaz y arranque.
+
+Uso:
+    python benchmarks/bench_nomina.py                                  # mide y muestra
+    python benchmarks/bench_nomina.py --guardar benchmarks/base.json   # guarda línea base
+    python benchmarks/bench_nomina.py --comparar benchmarks/base.json --umbral 0.25
+
+Cada caso reporta renglones (o llamadas, o reruns) por segundo, tomando el mejor de varias
+repeticiones. Con --comparar la suite falla (código 1) si algún caso cae más de `umbral`
+por debajo de la línea base. Las líneas base solo son comparables en la misma máquina.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [RAIZ, os.path.dirname(os.path.abspath(__file__))]
+
+import numpy as np
+
+from nomina_motor import (
+    calcular_imss_obrero, calcular_imss_patronal, calcular_isr_engine, obtener_dias_vacaciones_ley,
+    tarifa_isr,
+)
+from nomina_lote import calcular_nomina_lote
+
+TAMANOS_LOTE = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+MODULOS_UI = ("Nómina Periódica", "Aguinaldo", "Finiquito y Liquidación", "Registro de Nómina")
+SECCIONES = ("escalar", "lote", "ui", "arranque")
+
+
+def medir(funcion, unidades=1, repeticiones=5, minimo_s=0.2):
+    """Unidades por segundo de `funcion()` (mejor de `repeticiones` tandas de al menos `minimo_s`)."""
+    vueltas = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(vueltas): funcion()
+        if time.perf_counter() - t0 >= minimo_s / 10 or vueltas >= 1 << 20: break
+        vueltas *= 10
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        for _ in range(vueltas): funcion()
+        mejor = min(mejor, (time.perf_counter() - t0) / vueltas)
+    return unidades / mejor
+
+
+# --- CASOS ---
+
+def casos_escalar():
+    tarifa = tarifa_isr()
+    yield "escalar/calcular_isr_engine", "llamadas/s", lambda: calcular_isr_engine(18_500.0, tarifa)
+    yield "escalar/calcular_imss_obrero", "llamadas/s", lambda: calcular_imss_obrero(650.0, 15)
+    yield "escalar/calcular_imss_patronal", "llamadas/s", lambda: calcular_imss_patronal(650.0, 15, 0.5)
+    yield "escalar/obtener_dias_vacaciones_ley", "llamadas/s", lambda: obtener_dias_vacaciones_ley(7)
+
+def plantilla(n, semilla=12):
+    """Plantilla sintética reproducible de `n` empleados."""
+    rng = np.random.default_rng(semilla)
+    return dict(sueldo_diario=rng.uniform(250.0, 5_000.0, n).round(2), antiguedad=rng.integers(0, 35, n),
+                prima_riesgo=rng.choice([0.5, 2.5, 7.58875], n),
+                zona=np.where(rng.random(n) < 0.1, "Frontera Norte (ZLFN)", "Resto del País"))
+
+def casos_lote(tamanos):
+    for n in tamanos:
+        datos = plantilla(n)
+        yield f"lote/calcular_nomina_lote/{n}", "renglones/s", (lambda d=datos: calcular_nomina_lote(**d)), n
+
+def casos_ui():
+    from streamlit.logger import set_log_level
+    from streamlit.testing.v1 import AppTest
+    set_log_level("error")  # avisos de contexto en modo headless
+    for modulo in MODULOS_UI:
+        app = AppTest.from_file(os.path.join(RAIZ, "nomina_web.py"), default_timeout=120)
+        app.run()
+        app.sidebar.radio[0].set_value(modulo).run()
+        if app.exception:
+            raise RuntimeError(f"{modulo}: {app.exception[0].value}")
+        yield f"ui/rerun/{modulo}", "reruns/s", app.run
+
+def ejecutar(secciones, tamanos, repeticiones):
+    resultados = {}
+    def registrar(nombre, unidad, valor):
+        resultados[nombre] = {"valor": valor, "unidad": unidad}
+        print(f"{nombre:<50} {valor:>16,.1f} {unidad}", file=sys.stderr)
+
+    if "escalar" in secciones:
+        for nombre, unidad, funcion in casos_escalar():
+            registrar(nombre, unidad, medir(funcion, repeticiones=repeticiones))
+    if "lote" in secciones:
+        for nombre, unidad, funcion, n in casos_lote(tamanos):
+            registrar(nombre, unidad, medir(funcion, n, repeticiones=repeticiones if n < 100_000 else 2))
+    if "ui" in secciones:
+        for nombre, unidad, funcion in casos_ui():
+            registrar(nombre, unidad, medir(funcion, repeticiones=3, minimo_s=0.0))
+    if "arranque" in secciones:
+        # Aquí se reporta en imports/s para que "más es mejor" valga en toda la suite
+        from bench_arranque import MODULOS, medir_import
+        for modulo in MODULOS:
+            r = medir_import(modulo, max(repeticiones, 5))
+            registrar(f"arranque/import/{modulo}", "imports/s", 1000 / r["mediana_ms"])
+    return resultados
+
+
+# --- LÍNEAS BASE ---
+
+def metadatos():
+    return {"python": platform.python_version(), "numpy": np.__version__, "maquina": platform.machine(),
+            "sistema": platform.platform(), "procesador": platform.processor(), "cpus": os.cpu_count()}
+
+def comparar(base, actuales, umbral):
+    """Casos cuyo valor cayó más de `umbral` (fracción) respecto a la línea base."""
+    regresiones = []
+    for nombre, actual in actuales.items():
+        anterior = base.get(nombre)
+        if anterior is None: continue
+        cambio = actual["valor"] / anterior["valor"] - 1
+        if cambio < -umbral: regresiones.append((nombre, anterior["valor"], actual["valor"], cambio))
+    return regresiones
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--secciones", nargs="+", choices=SECCIONES, default=list(SECCIONES))
+    parser.add_argument("--max-lote", type=int, default=TAMANOS_LOTE[-1], help="Tamaño de lote más grande a medir")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--guardar", help="Escribe los resultados como línea base JSON")
+    parser.add_argument("--comparar", help="Línea base JSON contra la cual comparar")
+    parser.add_argument("--umbral", type=float, default=0.20, help="Caída máxima tolerada (0.20 = 20%%)")
+    args = parser.parse_args(argv)
+
+    tamanos = [n for n in TAMANOS_LOTE if n <= args.max_lote]
+    resultados = ejecutar(args.secciones, tamanos, args.repeticiones)
+    documento = {"metadatos": metadatos(), "resultados": resultados}
+    if args.guardar:
+        with open(args.guardar, "w", encoding="utf-8") as f:
+            json.dump(documento, f, ensure_ascii=False, indent=2)
+    else:
+        print(json.dumps(documento, ensure_ascii=False))
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        regresiones = comparar(base["resultados"], resultados, args.umbral)
+        for nombre, antes, ahora, cambio in regresiones:
+            print(f"REGRESIÓN {nombre}: {antes:,.1f} -> {ahora:,.1f} ({cambio:+.1%})", file=sys.stderr)
+        if regresiones:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
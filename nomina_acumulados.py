@@ -0,0 +1,129 @@
+"""Libro de acumulados mensuales para el ajuste de ISR (SQLite).
+
+Cada nómina calculada registra, por empleado y periodo, el ingreso gravado y el ISR
+retenido. Un trigger mantiene el acumulado del mes por empleado, de modo que el cierre
+(ajuste) lee ingreso_acumulado_prev e isr_retenido_prev con una búsqueda por llave en vez
+de sumar los periodos. Volver a registrar un periodo reemplaza sus montos.
+"""
+import sqlite3
+
+import numpy as np
+
+from nomina_lote import COLUMNA_EMPLEADO
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS movimientos (
+    anio INTEGER NOT NULL, mes INTEGER NOT NULL, empleado TEXT NOT NULL, periodo TEXT NOT NULL,
+    gravado REAL NOT NULL, isr_retenido REAL NOT NULL,
+    PRIMARY KEY (anio, mes, empleado, periodo)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS acumulado_mes (
+    anio INTEGER NOT NULL, mes INTEGER NOT NULL, empleado TEXT NOT NULL,
+    gravado REAL NOT NULL, isr_retenido REAL NOT NULL,
+    PRIMARY KEY (anio, mes, empleado)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS movimientos_alta AFTER INSERT ON movimientos BEGIN
+    INSERT INTO acumulado_mes VALUES (NEW.anio, NEW.mes, NEW.empleado, NEW.gravado, NEW.isr_retenido)
+    ON CONFLICT (anio, mes, empleado) DO UPDATE SET
+        gravado = gravado + excluded.gravado, isr_retenido = isr_retenido + excluded.isr_retenido;
+END;
+
+CREATE TRIGGER IF NOT EXISTS movimientos_cambio AFTER UPDATE ON movimientos BEGIN
+    UPDATE acumulado_mes SET
+        gravado = gravado - OLD.gravado + NEW.gravado,
+        isr_retenido = isr_retenido - OLD.isr_retenido + NEW.isr_retenido
+    WHERE anio = NEW.anio AND mes = NEW.mes AND empleado = NEW.empleado;
+END;
+
+CREATE TRIGGER IF NOT EXISTS movimientos_baja AFTER DELETE ON movimientos BEGIN
+    UPDATE acumulado_mes SET gravado = gravado - OLD.gravado, isr_retenido = isr_retenido - OLD.isr_retenido
+    WHERE anio = OLD.anio AND mes = OLD.mes AND empleado = OLD.empleado;
+END;
+"""
+
+_REGISTRAR = """
+INSERT INTO movimientos VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (anio, mes, empleado, periodo) DO UPDATE SET
+    gravado = excluded.gravado, isr_retenido = excluded.isr_retenido
+"""
+
+# Empleados del bloque que se consulta; temporal, propia de cada conexión
+_BLOQUE = "CREATE TEMP TABLE IF NOT EXISTS bloque (pos INTEGER PRIMARY KEY, empleado TEXT NOT NULL)"
+
+# Acumulado del mes sin el periodo que se está calculando (por si ya se había registrado),
+# sólo para los empleados del bloque: una búsqueda por llave primaria por empleado
+_ACUMULADOS = """
+SELECT b.pos, a.gravado - COALESCE(m.gravado, 0), a.isr_retenido - COALESCE(m.isr_retenido, 0)
+FROM temp.bloque b
+JOIN acumulado_mes a ON a.anio = ? AND a.mes = ? AND a.empleado = b.empleado
+LEFT JOIN movimientos m ON m.anio = a.anio AND m.mes = a.mes AND m.empleado = a.empleado AND m.periodo = ?
+"""
+
+
+class LibroAcumulados:
+    """Almacén de ingresos gravados e ISR retenido por empleado, mes y periodo."""
+
+    def __init__(self, ruta=":memory:"):
+        self.ruta = ruta
+        self.conexion = sqlite3.connect(ruta)
+        if ruta != ":memory:":
+            # Permite que los procesos del pool lean mientras el proceso principal registra
+            self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.executescript(_ESQUEMA)
+        self.conexion.execute(_BLOQUE)
+
+    def registrar(self, anio, mes, periodo, empleados, gravado, isr_retenido):
+        """Registra (o reemplaza) los montos de un periodo para cada empleado."""
+        filas = zip([anio] * len(empleados), [mes] * len(empleados), map(str, empleados), [periodo] * len(empleados),
+                    map(float, gravado), map(float, isr_retenido))
+        with self.conexion:
+            self.conexion.executemany(_REGISTRAR, filas)
+
+    def acumulados(self, anio, mes, empleados, periodo=""):
+        """Ingreso gravado e ISR retenido del mes para `empleados`, excluyendo `periodo`.
+
+        Regresa dos arreglos alineados con `empleados`; quien no tiene movimientos acumula 0.
+        Sólo se leen los renglones de `empleados`, no el mes completo.
+        """
+        gravado, isr = np.zeros(len(empleados)), np.zeros(len(empleados))
+        with self.conexion:
+            self.conexion.execute("DELETE FROM temp.bloque")
+            self.conexion.executemany("INSERT INTO temp.bloque VALUES (?, ?)", enumerate(map(str, empleados)))
+            filas = self.conexion.execute(_ACUMULADOS, (anio, mes, periodo)).fetchall()
+        if filas:
+            pos, g, i = zip(*filas)
+            gravado[list(pos)], isr[list(pos)] = g, i
+        return gravado, isr
+
+    def acumulado_anual(self, anio):
+        """Totales del año por empleado: (empleados, gravado, isr_retenido), ordenados por empleado."""
+        filas = self.conexion.execute(
+            "SELECT empleado, SUM(gravado), SUM(isr_retenido) FROM acumulado_mes WHERE anio = ? "
+            "GROUP BY empleado ORDER BY empleado", (anio,)).fetchall()
+        if not filas:
+            return [], np.zeros(0), np.zeros(0)
+        empleados, gravado, isr = zip(*filas)
+        return list(empleados), np.array(gravado, dtype=np.float64), np.array(isr, dtype=np.float64)
+
+    def cerrar(self):
+        self.conexion.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+# --- INTEGRACIÓN CON LA NÓMINA POR LOTES ---
+
+def con_acumulados(datos, libro, anio, mes, periodo=""):
+    """Copia de `datos` lista para el ajuste: agrega los acumulados previos del mes y es_ajuste."""
+    gravado, isr = libro.acumulados(anio, mes, datos[COLUMNA_EMPLEADO].to_numpy(), periodo)
+    return datos.assign(ingreso_acumulado_prev=gravado, isr_retenido_prev=isr, es_ajuste=True)
+
+def registrar_resultados(libro, anio, mes, periodo, empleados, resultados):
+    """Registra el Bruto (gravado) y el ISR de un resultado de calcular_nomina_lote."""
+    libro.registrar(anio, mes, periodo, empleados, resultados["Bruto"], resultados["ISR"])
@@ -0,0 +1,67 @@
+"""Cálculo anual de ISR (ajuste de diciembre) para toda la plantilla a la vez.
+
+Los ingresos gravados y el ISR retenido de cada periodo del año llegan como matrices
+empleados x periodos (24 quincenas, 52 semanas, ...); la suma por empleado y la tarifa
+anual se aplican sobre columnas completas con calcular_isr_lote.
+"""
+import numpy as np
+
+from nomina_motor import LIMITE_AJUSTE_ANUAL
+from nomina_lote import calcular_isr_lote
+from nomina_parametros import parametros_lote
+
+
+def _total_por_empleado(matriz):
+    """Suma por renglón en el orden de los periodos (igual que sum() del cálculo escalar)."""
+    matriz = np.asarray(matriz, dtype=np.float64)
+    if matriz.ndim == 1:
+        return matriz
+    matriz = np.nan_to_num(matriz)  # periodos sin pago
+    total = np.zeros(matriz.shape[0])
+    for j in range(matriz.shape[1]):
+        total = total + matriz[:, j]
+    return total
+
+def calcular_ajuste_anual_lote(ingresos_gravados, isr_retenido, anio=2026, anio_completo=True, indice=None,
+                               tabla_parametros=None):
+    """Equivalente vectorizado de calcular_ajuste_anual.
+
+    `ingresos_gravados` e `isr_retenido` son matrices empleados x periodos (NaN = sin pago) o
+    vectores ya totalizados. `anio_completo` (escalar o por empleado) indica si el trabajador
+    laboró del 1 de enero al 1 de diciembre; junto con el tope de ingresos determina si el
+    patrón debe hacer el cálculo (art. 97 LISR). Con `indice` se regresa un DataFrame. La tarifa
+    anual sale de `tabla_parametros` (nomina_parametros.cargar_parametros) si se da.
+    """
+    ingreso_anual = _total_por_empleado(ingresos_gravados)
+    retenido = _total_por_empleado(isr_retenido)
+    isr_anual, desglose = calcular_isr_lote(ingreso_anual, parametros_lote(anio, tabla_parametros).tarifa_isr_anual())
+    saldo = isr_anual - retenido
+    aplica = (ingreso_anual <= LIMITE_AJUSTE_ANUAL) & np.asarray(anio_completo, dtype=bool)
+    columnas = {
+        "Ingreso Anual": ingreso_anual,
+        "ISR Anual": isr_anual,
+        "Tasa (%)": desglose["Tasa (%)"],
+        "ISR Retenido": retenido,
+        "Saldo": saldo,
+        "Saldo a Cargo": np.where(aplica, np.maximum(saldo, 0.0), 0.0),
+        "Saldo a Favor": np.where(aplica, np.maximum(-saldo, 0.0), 0.0),
+        "Aplica Ajuste": np.broadcast_to(aplica, ingreso_anual.shape),
+    }
+    if indice is None:
+        return columnas
+    import pandas as pd
+    return pd.DataFrame(columnas, index=indice)
+
+def matrices_por_periodo(movimientos, columna_empleado="empleado", columna_periodo="periodo"):
+    """Convierte movimientos (un renglón por empleado y periodo, con gravado e isr_retenido) en
+    matrices empleados x periodos. Regresa (empleados, gravado, isr_retenido).
+    """
+    import pandas as pd
+    filas, empleados = pd.factorize(movimientos[columna_empleado], sort=True)
+    cols, periodos = pd.factorize(movimientos[columna_periodo], sort=True)
+    forma = (len(empleados), len(periodos))
+    gravado = np.full(forma, np.nan)
+    isr = np.full(forma, np.nan)
+    gravado[filas, cols] = movimientos["gravado"].to_numpy()
+    isr[filas, cols] = movimientos["isr_retenido"].to_numpy()
+    return empleados, gravado, isr
@@ -0,0 +1,145 @@
+"""Liquidación bimestral de cuotas IMSS, RCV e Infonavit con cambios de salario en el bimestre.
+
+El SBC de cada trabajador es una línea de tiempo compacta: un intervalo [inicio, fin) por
+movimiento (alta o modificación de salario; SBC 0 = baja), recortado al bimestre. Las
+ausencias e incapacidades se marcan en una rejilla trabajadores x días y se convierten en
+sumas prefijas, de modo que los días de cada tipo dentro de un intervalo salen de una resta.
+Las tasas son las de calcular_imss_obrero_lote / calcular_imss_patronal_lote por día de
+cotización (con el excedente de 3 UMA y la tasa de CyV del SBC de cada intervalo); cada
+concepto se multiplica por los días que le corresponden y se totaliza por trabajador con
+bincount.
+
+Días por concepto:
+  - Enfermedades y maternidad: descuentan incapacidades; las ausencias no (art. 31 LSS).
+  - Riesgo de trabajo, invalidez y vida, guarderías y RCV: descuentan ausencias e incapacidades.
+  - Infonavit: descuenta ausencias; durante la incapacidad se sigue aportando.
+Las ausencias cuentan hasta 7 por mes calendario; un día con incapacidad no es ausencia.
+"""
+from datetime import date
+
+import numpy as np
+
+from nomina_metricas import medido
+from nomina_lote import COLUMNA_EMPLEADO, _sumar, calcular_imss_obrero_lote, calcular_imss_patronal_lote
+from nomina_parametros import parametros_lote
+
+MAX_AUSENCIAS_MES = 7
+
+_EYM, _RESTO, _INFONAVIT = "eym", "resto", "infonavit"
+_DIAS_POR_CONCEPTO = {
+    "Enfermedad (Exc)": _EYM, "Cuota Fija": _EYM, "Excedente 3 UMA": _EYM, "Prest. Dinero": _EYM,
+    "Gastos Médicos": _EYM, "Riesgo Trabajo": _RESTO, "Invalidez y Vida": _RESTO, "Guarderías": _RESTO,
+    "Retiro (SAR)": _RESTO, "Cesantía y Vejez": _RESTO, "Infonavit": _INFONAVIT,
+}
+
+
+def periodo_bimestre(anio, bimestre):
+    """(inicio, fin) del bimestre 1..6 como datetime64[D]; `fin` es el primer día del siguiente."""
+    if not 1 <= bimestre <= 6:
+        raise ValueError(f"El bimestre va de 1 a 6, no {bimestre}")
+    inicio = date(anio, 2 * bimestre - 1, 1)
+    fin = date(anio + 1, 1, 1) if bimestre == 6 else date(anio, 2 * bimestre + 1, 1)
+    return np.datetime64(inicio, "D"), np.datetime64(fin, "D")
+
+def _desfase(fechas, inicio, dias):
+    """Día del bimestre (0..dias) de cada fecha, recortado a los extremos."""
+    return np.clip((np.asarray(fechas, dtype="datetime64[D]") - inicio).astype(np.int64), 0, dias)
+
+def linea_sbc(movimientos, inicio, dias, empleados):
+    """Intervalos de SBC del bimestre: (trabajador, desde, hasta, sbc, índice del movimiento).
+
+    `movimientos` trae empleado, fecha y sbc; cada uno rige desde su fecha hasta el siguiente
+    del mismo trabajador. Los anteriores al bimestre quedan en [0, 0) salvo el último.
+    """
+    trabajador = empleados.get_indexer(movimientos[COLUMNA_EMPLEADO])
+    fechas = movimientos["fecha"].to_numpy(dtype="datetime64[D]")
+    orden = np.lexsort((fechas, trabajador))
+    trabajador, desde = trabajador[orden], _desfase(fechas[orden], inicio, dias)
+    hasta = np.full_like(desde, dias)
+    mismo = trabajador[1:] == trabajador[:-1]
+    hasta[:-1][mismo] = desde[1:][mismo]
+    sbc = movimientos["sbc"].to_numpy(dtype=np.float64)[orden]
+    vigente = (hasta > desde) & (sbc > 0)
+    return trabajador[vigente], desde[vigente], hasta[vigente], sbc[vigente], orden[vigente]
+
+def _rejilla(eventos, empleados, inicio, dias):
+    """Días marcados por trabajador (n x dias, bool) a partir de renglones empleado, fecha y dias."""
+    n = len(empleados)
+    if eventos is None or len(eventos) == 0:
+        return np.zeros((n, dias), dtype=bool)
+    trabajador = empleados.get_indexer(eventos[COLUMNA_EMPLEADO])
+    if (trabajador < 0).any():
+        desconocidos = eventos[COLUMNA_EMPLEADO].to_numpy()[trabajador < 0]
+        raise ValueError(f"Empleados sin movimientos afiliatorios: {np.unique(desconocidos)[:10].tolist()}")
+    fechas = eventos["fecha"].to_numpy(dtype="datetime64[D]")
+    duracion = eventos["dias"].to_numpy(dtype=np.int64) if "dias" in eventos else np.ones(len(eventos), dtype=np.int64)
+    desde = _desfase(fechas, inicio, dias)
+    hasta = _desfase(fechas + duracion.astype("timedelta64[D]"), inicio, dias)
+    # Diferencias (+1 al entrar, -1 al salir) y suma acumulada por renglón
+    ancho = dias + 1
+    cambios = (np.bincount(trabajador * ancho + desde, minlength=n * ancho)
+               - np.bincount(trabajador * ancho + hasta, minlength=n * ancho))
+    return np.cumsum(cambios.reshape(n, ancho)[:, :dias], axis=1) > 0
+
+def _prefijas(marcas):
+    """Sumas prefijas por renglón con un cero al inicio: días en [a, b) = P[:, b] - P[:, a]."""
+    prefijas = np.zeros((marcas.shape[0], marcas.shape[1] + 1), dtype=np.int32)
+    np.cumsum(marcas, axis=1, out=prefijas[:, 1:])
+    return prefijas
+
+def _tope_mensual(ausencias, corte, tope=MAX_AUSENCIAS_MES):
+    """Deja a lo más `tope` ausencias por mes; `corte` es el primer día del segundo mes."""
+    topadas = ausencias.copy()
+    for mes in (slice(0, corte), slice(corte, None)):
+        topadas[:, mes] &= np.cumsum(ausencias[:, mes], axis=1) <= tope
+    return topadas
+
+@medido()
+def liquidar_bimestre(movimientos, anio, bimestre, ausencias=None, incapacidades=None, prima_riesgo=0.5,
+                      tabla_parametros=None):
+    """Cuotas obrero-patronales del bimestre por trabajador y concepto (DataFrame por empleado).
+
+    `movimientos`: empleado, fecha, sbc y opcionalmente prima_riesgo (si no, la del argumento).
+    `ausencias` e `incapacidades`: empleado, fecha y opcionalmente dias (1 por omisión).
+    `tabla_parametros`: tabla de nomina_parametros.cargar_parametros en vez del registro interno.
+    """
+    import pandas as pd
+    inicio, fin = periodo_bimestre(anio, bimestre)
+    dias = int((fin - inicio).astype(np.int64))
+    corte = int((np.datetime64(date(anio, 2 * bimestre, 1), "D") - inicio).astype(np.int64))
+    empleados = pd.Index(pd.unique(movimientos[COLUMNA_EMPLEADO]), name=COLUMNA_EMPLEADO).sort_values()
+    n = len(empleados)
+
+    trabajador, desde, hasta, sbc, origen = linea_sbc(movimientos, inicio, dias, empleados)
+    incapacitado = _rejilla(incapacidades, empleados, inicio, dias)
+    ausente = _tope_mensual(_rejilla(ausencias, empleados, inicio, dias) & ~incapacitado, corte)
+    p_inc, p_aus = _prefijas(incapacitado), _prefijas(ausente)
+    d_inc = p_inc[trabajador, hasta] - p_inc[trabajador, desde]
+    d_aus = p_aus[trabajador, hasta] - p_aus[trabajador, desde]
+    periodo = hasta - desde
+    dias_concepto = {_EYM: periodo - d_inc, _RESTO: periodo - d_inc - d_aus, _INFONAVIT: periodo - d_aus}
+
+    p = parametros_lote(anio, tabla_parametros)
+    sbc = np.minimum(sbc, p.campo("uma") * 25)
+    prima = prima_riesgo
+    if "prima_riesgo" in movimientos: prima = movimientos["prima_riesgo"].to_numpy(dtype=np.float64)[origen]
+    # Cuota por día de cotización de cada intervalo, con las mismas tasas que la nómina
+    _, obrero_dia = calcular_imss_obrero_lote(sbc, 1, p)
+    _, patronal_dia = calcular_imss_patronal_lote(sbc, 1, prima, p)
+
+    def por_trabajador(cuotas):
+        return {k: np.bincount(trabajador, weights=v * dias_concepto[_DIAS_POR_CONCEPTO[k]], minlength=n)
+                for k, v in cuotas.items()}
+    obrero, patronal = por_trabajador(obrero_dia), por_trabajador(patronal_dia)
+    columnas = {
+        "Días Cotizados": np.bincount(trabajador, weights=dias_concepto[_RESTO], minlength=n).astype(np.int64),
+        "Ausencias": np.bincount(trabajador, weights=d_aus, minlength=n).astype(np.int64),
+        "Incapacidades": np.bincount(trabajador, weights=d_inc, minlength=n).astype(np.int64),
+        "Intervalos SBC": np.bincount(trabajador, minlength=n),
+    }
+    columnas.update({f"Obrero: {k}": v for k, v in obrero.items()})
+    columnas["IMSS Obrero"] = _sumar(obrero)
+    columnas.update({f"Patronal: {k}": v for k, v in patronal.items()})
+    columnas["IMSS Patronal"] = _sumar(patronal)
+    columnas["Total Bimestre"] = columnas["IMSS Obrero"] + columnas["IMSS Patronal"]
+    return pd.DataFrame(columnas, index=empleados)
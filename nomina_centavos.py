@@ -0,0 +1,242 @@
+"""Nómina por lotes en centavos enteros (int64) con redondeo definido por concepto.
+
+Mismo cálculo que calcular_nomina_lote, pero cada monto se lleva en centavos y cada concepto
+se redondea una sola vez, al centavo y hacia arriba en la mitad (half-up). Los totales son
+sumas exactas de conceptos ya redondeados, así que el recibo cuadra al centavo:
+IMSS = suma de conceptos y Neto = Bruto - ISR - IMSS Obrero, sin residuos de punto flotante.
+
+Reglas de redondeo:
+  - sueldo diario: al centavo (entradas en pesos con más de dos decimales);
+  - SBC: sueldo diario x factor de integración, al centavo, topado a 25 UMA; el rango de
+    CyV se elige con el SBC sin redondear (el mismo que el cálculo en flotante), porque un
+    SBC redondeado puede caer justo en un tope (p. ej. 234.62 = 2 UMA) y cambiar la tasa;
+  - cada cuota IMSS, el ISR del mes, el ISR del periodo y el ISN: al centavo.
+
+Las tasas se guardan en diezmillonésimos (enteros) y las cuotas fijas de IMSS salen de un
+producto matricial bases x tasas. Los días del periodo se manejan en décimas (15.2, 30.4).
+El resultado es un arreglo estructurado, de 134 bytes por empleado. Con la columna anio cada
+ejercicio se calcula con sus propios parámetros, del registro interno o de una tabla cargada
+con nomina_parametros.cargar_parametros.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from nomina_metricas import medido
+from nomina_motor import METODOS_ISR
+from nomina_lote import _COLUMNAS_ENTRADA, dias_vacaciones_lote, salario_minimo_lote, tabla_isr_arreglos, tasa_cyv_lote
+from nomina_parametros import DTYPE_PARAMETROS, parametros_lote
+
+ESCALA_TASA = 10_000_000  # tasas en diezmillonésimos: 0.00375 -> 37_500
+
+def a_centavos(pesos):
+    """Pesos -> centavos int64, half-up (tolera el error de representación de x.xx5)."""
+    return np.floor(np.asarray(pesos, dtype=np.float64) * 100 + 0.5 + 1e-6).astype(np.int64)
+
+def a_pesos(centavos):
+    return np.asarray(centavos) / 100
+
+def _tasa(fraccion):
+    return np.rint(np.asarray(fraccion, dtype=np.float64) * ESCALA_TASA).astype(np.int64)
+
+def _entre(numerador, denominador):
+    """División entera half-up para numeradores >= 0."""
+    return (numerador + denominador // 2) // denominador
+
+def _decimas(dias):
+    return int(round(dias * 10))
+
+# Bases por renglón (columnas de la matriz): SBC, excedente de 3 UMA y UMA (cuota fija)
+_BASES = ("sbc", "excedente", "uma")
+
+# Conceptos con tasa fija: (campo, etiqueta, base, tasa). Mismas tasas que nomina_motor.
+_OBRERO = (
+    ("obr_enfermedad_exc", "Enfermedad (Exc)", "excedente", 0.004),
+    ("obr_prest_dinero", "Prest. Dinero", "sbc", 0.0025),
+    ("obr_gastos_medicos", "Gastos Médicos", "sbc", 0.00375),
+    ("obr_invalidez_vida", "Invalidez y Vida", "sbc", 0.00625),
+    ("obr_cesantia_vejez", "Cesantía y Vejez", "sbc", 0.01125),
+)
+_PATRONAL = (
+    ("pat_cuota_fija", "Cuota Fija", "uma", 0.204),
+    ("pat_excedente", "Excedente 3 UMA", "excedente", 0.011),
+    ("pat_prest_dinero", "Prest. Dinero", "sbc", 0.007),
+    ("pat_gastos_medicos", "Gastos Médicos", "sbc", 0.0105),
+    ("pat_riesgo_trabajo", "Riesgo Trabajo", "sbc", None),   # prima de cada empresa
+    ("pat_invalidez_vida", "Invalidez y Vida", "sbc", 0.0175),
+    ("pat_guarderias", "Guarderías", "sbc", 0.01),
+    ("pat_retiro", "Retiro (SAR)", "sbc", 0.02),
+    ("pat_cesantia_vejez", "Cesantía y Vejez", "sbc", None),  # tasa por rango de UMA
+    ("pat_infonavit", "Infonavit", "sbc", 0.05),
+)
+_FIJOS = [c for c in _OBRERO + _PATRONAL if c[3] is not None]
+
+def _matriz_tasas(conceptos):
+    tasas = np.zeros((len(_BASES), len(conceptos)), dtype=np.int64)
+    for j, (_, _, base, tasa) in enumerate(conceptos):
+        tasas[_BASES.index(base), j] = _tasa(tasa)
+    return tasas
+
+_TASAS_FIJAS = _matriz_tasas(_FIJOS)
+
+def tarifa_centavos(tabla_isr):
+    """Tarifa de ISR como (límites en centavos, cuotas en centavos, porcentajes en diezmillonésimos)."""
+    limites, cuotas, porcs = tabla_isr_arreglos(tabla_isr)
+    return a_centavos(limites), a_centavos(cuotas), _tasa(porcs)
+
+def parametros_centavos(anio=2026, tabla=None):
+    """UMA, escalera de CyV y tarifa mensual del ejercicio, en enteros; de `tabla` si se da."""
+    return _parametros_centavos(int(anio), None if tabla is None else tabla.tobytes())
+
+@lru_cache(maxsize=32)
+def _parametros_centavos(anio, contenido):
+    # La tabla (unos KB) se identifica por su contenido, así cada copia cargada comparte entrada
+    p = parametros_lote(anio, None if contenido is None else np.frombuffer(contenido, dtype=DTYPE_PARAMETROS))
+    uma_c = int(a_centavos(p.campo("uma")))
+    # CyV: tope en veces UMA x 100 x UMA en centavos, comparado contra SBC x 100 (todo entero)
+    return {"anio": anio, "uma": uma_c, "tope_sbc": 25 * uma_c,
+            "cyv_topes": np.rint(p.campo("cyv_topes") * 100).astype(np.int64) * uma_c,
+            "cyv_tasas": _tasa(p.campo("cyv_tasas")), "isr": tarifa_centavos(p.tarifa_isr())}
+
+def calcular_isr_centavos(base_c, tarifa):
+    limites, cuotas, porcs = tarifa
+    idx = np.searchsorted(limites, base_c, side="right") - 1
+    dentro = idx >= 0
+    idx = np.maximum(idx, 0)
+    excedente = np.where(dentro, base_c - limites[idx], 0)
+    return np.where(dentro, cuotas[idx] + _entre(excedente * porcs[idx], ESCALA_TASA), 0)
+
+def cuotas_imss_centavos(sbc_c, dias_pago, prima_riesgo, anio=2026, sbc=None, tabla_parametros=None):
+    """Cuotas IMSS obrero y patronal por concepto: {campo: centavos}, en el orden de _OBRERO + _PATRONAL.
+
+    `sbc` (pesos, sin redondear) elige el rango de CyV; si no se da, se usa `sbc_c`.
+    """
+    pc = parametros_centavos(anio, tabla_parametros)
+    sbc_c = np.asarray(sbc_c, dtype=np.int64)
+    dias_d = _decimas(dias_pago)
+    bases = np.column_stack([sbc_c, np.maximum(0, sbc_c - 3 * pc["uma"]), np.full_like(sbc_c, pc["uma"])])
+    # base (centavos) x tasa (1e-7) x días (décimas): se divide entre 1e8 al redondear
+    fijos = _entre((bases @ _TASAS_FIJAS) * dias_d, ESCALA_TASA * 10)
+    montos = {campo: fijos[:, j] for j, (campo, *_) in enumerate(_FIJOS)}
+    tasa_riesgo = _tasa(np.asarray(prima_riesgo, dtype=np.float64) / 100)
+    if sbc is None: tasa_cyv = pc["cyv_tasas"][np.searchsorted(pc["cyv_topes"], sbc_c * 100, side="left")]
+    else: tasa_cyv = _tasa(tasa_cyv_lote(sbc, parametros_lote(anio, tabla_parametros)))
+    montos["pat_riesgo_trabajo"] = _entre(sbc_c * tasa_riesgo * dias_d, ESCALA_TASA * 10)
+    montos["pat_cesantia_vejez"] = _entre(sbc_c * tasa_cyv * dias_d, ESCALA_TASA * 10)
+    return {campo: montos[campo] for campo, *_ in _OBRERO + _PATRONAL}
+
+
+# --- RESULTADO COLUMNAR ---
+
+# Las cuotas IMSS por concepto caben en int32 (SBC topado a 25 UMA); los totales van en int64
+DTYPE_NOMINA = np.dtype(
+    [("sueldo_diario", "i8"), ("sbc", "i8"), ("salario_minimo", "?"), ("ajuste", "?"), ("bruto", "i8"), ("isr", "i8"),
+     ("imss_obrero", "i8")]
+    + [(campo, "i4") for campo, *_ in _OBRERO]
+    + [("imss_patronal", "i8")]
+    + [(campo, "i4") for campo, *_ in _PATRONAL]
+    + [("isn", "i8"), ("neto", "i8"), ("costo_total", "i8")]
+)
+
+# Campo -> columna de calcular_nomina_lote
+ETIQUETAS = {"sueldo_diario": "Sueldo Diario", "sbc": "SBC", "salario_minimo": "Salario Mínimo", "ajuste": "Ajuste",
+             "bruto": "Bruto", "isr": "ISR", "imss_obrero": "IMSS Obrero",
+             **{campo: f"Obrero: {etiqueta}" for campo, etiqueta, *_ in _OBRERO},
+             "imss_patronal": "IMSS Patronal",
+             **{campo: f"Patronal: {etiqueta}" for campo, etiqueta, *_ in _PATRONAL},
+             "isn": "ISN", "neto": "Neto", "costo_total": "Costo Total"}
+
+def como_dataframe(resultado, index=None, pesos=True):
+    """DataFrame con las columnas de calcular_nomina_lote (en pesos, o en centavos con pesos=False)."""
+    import pandas as pd
+    columnas = {}
+    for campo, etiqueta in ETIQUETAS.items():
+        valores = resultado[campo]
+        columnas[etiqueta] = a_pesos(valores) if pesos and valores.dtype != bool else valores
+    return pd.DataFrame(columnas, index=index)
+
+
+# --- NÓMINA PERIÓDICA EN CENTAVOS ---
+
+_POR_RENGLON = ("antiguedad", "prima_riesgo", "zona", "tasa_isn", "es_ajuste", "ingreso_acumulado_prev", "isr_retenido_prev")
+BLOQUE = 16_384
+
+def _llenar(resultado, sd, sd_c, entrada, dias_pago, dias_mes_base, anio, tarifa_periodo, tabla_parametros):
+    """Calcula un bloque de renglones de un ejercicio y lo escribe en `resultado` (vista del arreglo estructurado).
+
+    `sd` es el sueldo diario en pesos sin redondear; sólo se usa para el rango de CyV.
+    """
+    pc, p = parametros_centavos(anio, tabla_parametros), parametros_lote(anio, tabla_parametros)
+    dias_d, mes_d = _decimas(dias_pago), _decimas(dias_mes_base)
+    sm_c = a_centavos(salario_minimo_lote(entrada["zona"], p))
+    es_ajuste = entrada["es_ajuste"].astype(bool)
+
+    # Factor de integración (365 + 15 + vac/4) / 365, en cuartos de día para quedar en enteros
+    dias_vac = dias_vacaciones_lote(entrada["antiguedad"], p)
+    sbc_c = np.minimum(_entre(sd_c * (4 * (365 + 15) + dias_vac.astype(np.int64)), 4 * 365), pc["tope_sbc"])
+    sbc = np.minimum(sd * (1 + ((15 + (dias_vac*0.25))/365)), p.campo("uma") * 25)
+    bruto_c = _entre(sd_c * dias_d, 10)
+    cuotas = cuotas_imss_centavos(sbc_c, dias_pago, entrada["prima_riesgo"], anio, sbc, tabla_parametros)
+    imss_obrero_c = sum(cuotas[campo] for campo, *_ in _OBRERO)
+    imss_patronal_c = sum(cuotas[campo] for campo, *_ in _PATRONAL)
+
+    es_salario_minimo = sd_c <= sm_c + 100
+    base_ajuste = a_centavos(entrada["ingreso_acumulado_prev"]) + bruto_c
+    base_mensual = np.where(es_ajuste, base_ajuste, _entre(sd_c * mes_d, 10))
+    isr_mensual = calcular_isr_centavos(base_mensual, pc["isr"])
+    isr_ajuste = isr_mensual - a_centavos(entrada["isr_retenido_prev"])
+    if tarifa_periodo is not None: isr_ordinario = calcular_isr_centavos(bruto_c, tarifa_periodo)
+    else: isr_ordinario = _entre(isr_mensual * dias_d, mes_d)
+    isr_c = np.where(es_salario_minimo, 0, np.where(es_ajuste, isr_ajuste, isr_ordinario))
+    isn_c = _entre(bruto_c * _tasa(entrada["tasa_isn"].astype(np.float64) / 100), ESCALA_TASA)
+
+    columnas = {"sueldo_diario": sd_c, "sbc": sbc_c, "salario_minimo": es_salario_minimo, "ajuste": es_ajuste,
+                "bruto": bruto_c, "isr": isr_c, "imss_obrero": imss_obrero_c, "imss_patronal": imss_patronal_c,
+                "isn": isn_c, "neto": bruto_c - imss_obrero_c - isr_c, "costo_total": bruto_c + imss_patronal_c + isn_c}
+    columnas.update(cuotas)
+    for campo, valores in columnas.items():
+        resultado[campo] = valores
+
+@medido()
+def calcular_nomina_centavos(datos=None, *, sueldo_diario=None, sueldo_mensual=None, monto_periodo=None, antiguedad=1,
+                             prima_riesgo=0.5, zona="Resto del País", tasa_isn=3.0, dias_pago=15, dias_mes_base=30.0,
+                             es_ajuste=False, ingreso_acumulado_prev=0.0, isr_retenido_prev=0.0,
+                             metodo_isr=METODOS_ISR[0], periodo=None, anio=2026, tabla_parametros=None):
+    """Nómina periódica en centavos; mismos argumentos (en pesos) que calcular_nomina_lote.
+
+    Regresa un arreglo estructurado DTYPE_NOMINA con un renglón por empleado, en centavos.
+    """
+    entrada = {"sueldo_diario": sueldo_diario, "sueldo_mensual": sueldo_mensual, "monto_periodo": monto_periodo,
+               "antiguedad": antiguedad, "prima_riesgo": prima_riesgo, "zona": zona, "tasa_isn": tasa_isn,
+               "es_ajuste": es_ajuste, "ingreso_acumulado_prev": ingreso_acumulado_prev,
+               "isr_retenido_prev": isr_retenido_prev, "anio": anio}
+    if datos is not None:
+        for col in _COLUMNAS_ENTRADA:
+            if col in datos: entrada[col] = datos[col].to_numpy()
+    if entrada["sueldo_diario"] is not None: sd = np.asarray(entrada["sueldo_diario"], dtype=np.float64)
+    elif entrada["sueldo_mensual"] is not None: sd = np.asarray(entrada["sueldo_mensual"], dtype=np.float64) / dias_mes_base
+    elif entrada["monto_periodo"] is not None: sd = np.asarray(entrada["monto_periodo"], dtype=np.float64) / dias_pago
+    else: raise ValueError("Falta el ingreso: sueldo_diario, sueldo_mensual o monto_periodo")
+
+    sd = np.atleast_1d(sd)
+    sd_c = a_centavos(sd)
+    n = sd_c.shape
+    renglon = {k: np.broadcast_to(np.asarray(entrada[k]), n) for k in _POR_RENGLON}
+    anios = np.broadcast_to(np.asarray(entrada["anio"]), n)
+    resultado = np.empty(n, dtype=DTYPE_NOMINA)
+    ejercicios = np.unique(anios)
+    for anio in ejercicios.tolist():
+        # Con años mezclados cada ejercicio se calcula aparte y se reacomoda en su lugar
+        filas = np.flatnonzero(anios == anio) if len(ejercicios) > 1 else slice(None)
+        sd_anio, sd_c_anio, renglon_anio = sd[filas], sd_c[filas], {k: v[filas] for k, v in renglon.items()}
+        parte = np.empty(len(sd_c_anio), dtype=DTYPE_NOMINA) if len(ejercicios) > 1 else resultado
+        tarifa_periodo = None
+        if metodo_isr == METODOS_ISR[1] and periodo is not None:
+            tarifa_periodo = tarifa_centavos(parametros_lote(anio, tabla_parametros).tarifa_isr_periodo(periodo, metodo_isr))
+        # Por bloques: el arreglo estructurado se escribe campo por campo y así cada bloque sigue en caché
+        for i in range(0, len(sd_c_anio), BLOQUE):
+            b = slice(i, i + BLOQUE)
+            _llenar(parte[b], sd_anio[b], sd_c_anio[b], {k: v[b] for k, v in renglon_anio.items()}, dias_pago, dias_mes_base,
+                    anio, tarifa_periodo, tabla_parametros)
+        if len(ejercicios) > 1: resultado[filas] = parte
+    return resultado
@@ -0,0 +1,375 @@
+"""Ejecución de nómina sin interfaz: procesa un archivo de empleados por bloques.
+
+Uso:
+    python nomina_cli.py nomina empleados.csv resultados.csv --periodo Quincenal --criterio "Comercial (30)"
+
+El archivo de entrada (CSV o Parquet) lleva una fila por empleado con sueldo_diario,
+sueldo_mensual o monto_periodo, y opcionalmente antiguedad, prima_riesgo, zona, tasa_isn,
+es_ajuste, ingreso_acumulado_prev, isr_retenido_prev y anio (ejercicio con cuyos parámetros se
+calcula el renglón). Las demás columnas (número de
+empleado, departamento, ...) se copian tal cual a la salida. Cada bloque se calcula y se
+escribe antes de leer el siguiente, así que la memoria no depende del tamaño del archivo.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from functools import partial
+
+import pandas as pd
+
+from nomina_motor import METODOS_AGUINALDO, METODOS_ISR, PERIODOS_PAGO, dias_del_periodo, dias_mes_por_criterio
+from nomina_acumulados import LibroAcumulados, con_acumulados, registrar_resultados
+from nomina_inversa import calcular_bruto_desde_neto
+from nomina_centavos import calcular_nomina_centavos, como_dataframe
+from nomina_anual import calcular_ajuste_anual_lote, matrices_por_periodo
+from nomina_bimestral import liquidar_bimestre
+from nomina_metricas import iniciar_rerun, terminar_rerun, tramo
+from nomina_lote import COLUMNA_EMPLEADO, calcular_aguinaldo_lote, calcular_finiquito_lote, calcular_nomina_lote
+from nomina_paralelo import iterar_en_orden
+from nomina_parametros import cargar_parametros, guardar_parametros, parametros_compilados
+from nomina_recibos import EscritorZip, encabezado_recibo, recibos_de_bloque
+
+TAMANO_BLOQUE = 100_000
+
+
+# --- LECTURA / ESCRITURA POR BLOQUES ---
+
+def _es_parquet(ruta):
+    return os.path.splitext(ruta)[1].lower() in (".parquet", ".pq")
+
+def _pyarrow_parquet():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("Los archivos Parquet requieren pyarrow (pip install pyarrow)")
+    return pq
+
+def leer_por_bloques(ruta, tamano=TAMANO_BLOQUE):
+    """Genera DataFrames de a lo más `tamano` renglones, sin cargar el archivo completo."""
+    if _es_parquet(ruta):
+        archivo = _pyarrow_parquet().ParquetFile(ruta)
+        inicio = 0
+        for lote in archivo.iter_batches(batch_size=tamano):
+            df = lote.to_pandas()
+            df.index = pd.RangeIndex(inicio, inicio + len(df))
+            inicio += len(df)
+            yield df
+    else:
+        yield from pd.read_csv(ruta, chunksize=tamano)
+
+class EscritorPorBloques:
+    """Escribe bloques de resultados de forma incremental en CSV o Parquet."""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.renglones = 0
+        self._parquet = _es_parquet(ruta)
+        self._escritor = None
+
+    def escribir(self, df):
+        if self._parquet:
+            import pyarrow as pa
+            tabla = pa.Table.from_pandas(df, preserve_index=False)
+            if self._escritor is None:
+                self._escritor = _pyarrow_parquet().ParquetWriter(self.ruta, tabla.schema)
+            self._escritor.write_table(tabla)
+        else:
+            df.to_csv(self.ruta, mode="w" if self.renglones == 0 else "a", header=self.renglones == 0, index=False)
+        self.renglones += len(df)
+
+    def cerrar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+def procesar_por_bloques(entrada, salida, calcular, tamano=TAMANO_BLOQUE, procesos=1, al_escribir=None,
+                         abrir=EscritorPorBloques):
+    """Aplica `calcular(df) -> df` a cada bloque de `entrada` y lo escribe en `salida`.
+
+    Con `procesos` > 1 los bloques se calculan en un pool (`calcular` debe poderse serializar)
+    y se escriben en el orden de lectura, con a lo más dos bloques en vuelo por proceso.
+    `al_escribir(df)`, si se da, corre en el proceso principal con cada bloque de resultados.
+    `abrir(salida)` crea el escritor (p. ej. nomina_recibos.EscritorZip para documentos).
+    Regresa (renglones, segundos).
+    """
+    inicio = time.perf_counter()
+    with abrir(salida) as escritor:
+        bloques = leer_por_bloques(entrada, tamano)
+        if procesos > 1:
+            ejecutor = ProcessPoolExecutor(max_workers=procesos)
+            resultados = iterar_en_orden(ejecutor, calcular, bloques, 2 * procesos)
+        else:
+            ejecutor = None
+            resultados = map(calcular, bloques)
+        try:
+            for resultado in resultados:
+                with tramo("cli/escribir"): escritor.escribir(resultado)
+                if al_escribir is not None: al_escribir(resultado)
+        finally:
+            if ejecutor is not None: ejecutor.shutdown()
+    return escritor.renglones, time.perf_counter() - inicio
+
+def _unir(bloque, resultado):
+    return pd.concat([bloque, resultado], axis=1)
+
+def _tabla_parametros(args):
+    """Tabla de --parametros (abierta con mmap) o None para el registro interno."""
+    return cargar_parametros(args.parametros) if args.parametros else None
+
+
+# --- COMANDOS ---
+
+def _nomina_bloque(parametros, acumulados, bloque):
+    if acumulados is not None:
+        ruta, anio, mes, clave_periodo = acumulados
+        with LibroAcumulados(ruta) as libro:
+            bloque = con_acumulados(bloque, libro, anio, mes, clave_periodo)
+    parametros = dict(parametros)
+    if parametros.pop("centavos", False):
+        return _unir(bloque, como_dataframe(calcular_nomina_centavos(bloque, **parametros), index=bloque.index))
+    return _unir(bloque, calcular_nomina_lote(bloque, **parametros))
+
+def _cmd_nomina(args):
+    dias_mes_base = dias_mes_por_criterio(args.criterio)
+    parametros = dict(prima_riesgo=args.prima_riesgo, zona=args.zona, tasa_isn=args.tasa_isn,
+                      dias_pago=dias_del_periodo(args.periodo, dias_mes_base), dias_mes_base=dias_mes_base,
+                      es_ajuste=args.ajuste, metodo_isr=args.metodo_isr, periodo=args.periodo, centavos=args.centavos,
+                      anio=2026 if args.anio is None else args.anio, tabla_parametros=_tabla_parametros(args))
+    if args.acumulados is None:
+        calcular = partial(_nomina_bloque, parametros, None)
+        return procesar_por_bloques(args.entrada, args.salida, calcular, args.bloque, args.procesos)
+
+    if args.anio is None or args.mes is None or args.clave_periodo is None:
+        raise SystemExit("--acumulados requiere --anio, --mes y --clave-periodo")
+    # En el ajuste cada bloque lee el acumulado del mes; toda corrida registra lo que calcula
+    lectura = (args.acumulados, args.anio, args.mes, args.clave_periodo) if args.ajuste else None
+    with LibroAcumulados(args.acumulados) as libro:
+        def registrar(resultado):
+            if COLUMNA_EMPLEADO not in resultado:
+                raise SystemExit(f"--acumulados requiere la columna '{COLUMNA_EMPLEADO}' en la entrada")
+            registrar_resultados(libro, args.anio, args.mes, args.clave_periodo, resultado[COLUMNA_EMPLEADO], resultado)
+        return procesar_por_bloques(args.entrada, args.salida, partial(_nomina_bloque, parametros, lectura),
+                                    args.bloque, args.procesos, registrar)
+
+def _recibos_bloque(parametros, encabezado, formatos, bloque):
+    resultados = _unir(bloque, calcular_nomina_lote(bloque, **parametros, desglose_isr=True))
+    return recibos_de_bloque(resultados, encabezado, formatos)
+
+def _cmd_recibos(args):
+    dias_mes_base = dias_mes_por_criterio(args.criterio)
+    dias_pago = dias_del_periodo(args.periodo, dias_mes_base)
+    parametros = dict(prima_riesgo=args.prima_riesgo, zona=args.zona, tasa_isn=args.tasa_isn, dias_pago=dias_pago,
+                      dias_mes_base=dias_mes_base, es_ajuste=args.ajuste, metodo_isr=args.metodo_isr,
+                      periodo=args.periodo, anio=args.anio, tabla_parametros=_tabla_parametros(args))
+    encabezado = encabezado_recibo(args.periodo, dias_pago, dias_mes_base, args.metodo_isr,
+                                   date.fromisoformat(args.fecha_pago) if args.fecha_pago else None,
+                                   args.emisor_rfc, args.emisor_nombre, lugar_expedicion=args.lugar_expedicion)
+    formatos = ("xml", "html") if args.html else ("xml",)
+    return procesar_por_bloques(args.entrada, args.salida, partial(_recibos_bloque, parametros, encabezado, formatos),
+                                args.bloque, args.procesos, abrir=partial(EscritorZip, documentos_por_recibo=len(formatos)))
+
+def _bruto_bloque(parametros, bloque):
+    return _unir(bloque, calcular_bruto_desde_neto(bloque, **parametros))
+
+def _cmd_bruto(args):
+    dias_mes_base = dias_mes_por_criterio(args.criterio)
+    parametros = dict(prima_riesgo=args.prima_riesgo, zona=args.zona, tasa_isn=args.tasa_isn,
+                      dias_pago=dias_del_periodo(args.periodo, dias_mes_base), dias_mes_base=dias_mes_base,
+                      metodo_isr=args.metodo_isr, periodo=args.periodo, anio=args.anio,
+                      tabla_parametros=_tabla_parametros(args))
+    return procesar_por_bloques(args.entrada, args.salida, partial(_bruto_bloque, parametros), args.bloque, args.procesos)
+
+def _finiquito_bloque(parametros, bloque):
+    for col in ("f_alta", "f_baja"):
+        if col in bloque: bloque[col] = pd.to_datetime(bloque[col])
+    detalle = calcular_finiquito_lote(bloque, **parametros)
+    if not parametros["detalle"]:
+        return _unir(bloque, detalle)
+    # Un renglón por concepto: se repiten las columnas de identificación del empleado
+    ids = [c for c in bloque.columns if c not in ("causa", "f_alta", "f_baja", "sueldo_mensual", "zona", "dias_vac_no_gozadas", "anio")]
+    return pd.concat([bloque.loc[detalle.index, ids].reset_index(drop=True), detalle.reset_index(drop=True)], axis=1)
+
+def _cmd_finiquito(args):
+    parametros = dict(causa=args.causa, zona=args.zona, detalle=not args.totales, anio=args.anio,
+                      tabla_parametros=_tabla_parametros(args))
+    return procesar_por_bloques(args.entrada, args.salida, partial(_finiquito_bloque, parametros), args.bloque, args.procesos)
+
+def _aguinaldo_bloque(parametros, bloque):
+    if "f_ingreso" in bloque: bloque["f_ingreso"] = pd.to_datetime(bloque["f_ingreso"])
+    return _unir(bloque, calcular_aguinaldo_lote(bloque, **parametros))
+
+def _cmd_aguinaldo(args):
+    parametros = dict(dias_ley=args.dias_ley, metodo=args.metodo, anio=args.anio, tabla_parametros=_tabla_parametros(args))
+    return procesar_por_bloques(args.entrada, args.salida, partial(_aguinaldo_bloque, parametros), args.bloque, args.procesos)
+
+def _cmd_anual(args):
+    inicio = time.perf_counter()
+    if args.acumulados:
+        with LibroAcumulados(args.acumulados) as libro:
+            empleados, gravado, isr = libro.acumulado_anual(args.anio)
+    elif args.movimientos:
+        # El cálculo anual necesita todos los periodos de cada empleado: se lee el archivo completo
+        movimientos = pd.concat(leer_por_bloques(args.movimientos))
+        empleados, gravado, isr = matrices_por_periodo(movimientos)
+    else:
+        raise SystemExit("Indica --acumulados o --movimientos")
+    indice = pd.Index(empleados, name=COLUMNA_EMPLEADO)
+    resultado = calcular_ajuste_anual_lote(gravado, isr, args.anio, indice=indice,
+                                           tabla_parametros=_tabla_parametros(args)).reset_index()
+    with EscritorPorBloques(args.salida) as escritor:
+        escritor.escribir(resultado)
+    return len(resultado), time.perf_counter() - inicio
+
+def _leer_con_fechas(ruta):
+    if ruta is None: return None
+    datos = pd.concat(leer_por_bloques(ruta))
+    datos["fecha"] = pd.to_datetime(datos["fecha"])
+    return datos
+
+def _cmd_bimestral(args):
+    inicio = time.perf_counter()
+    # La línea de tiempo de cada trabajador necesita todos sus movimientos: se leen completos
+    movimientos = _leer_con_fechas(args.movimientos)
+    resultado = liquidar_bimestre(movimientos, args.anio, args.bimestre, _leer_con_fechas(args.ausencias),
+                                  _leer_con_fechas(args.incapacidades), args.prima_riesgo,
+                                  _tabla_parametros(args)).reset_index()
+    with tramo("cli/escribir"), EscritorPorBloques(args.salida) as escritor:
+        escritor.escribir(resultado)
+    return len(resultado), time.perf_counter() - inicio
+
+def _cmd_parametros(args):
+    inicio = time.perf_counter()
+    tabla = parametros_compilados()
+    with tramo("cli/escritura"):
+        guardar_parametros(args.salida, tabla)
+    return len(tabla), time.perf_counter() - inicio
+
+def construir_parser():
+    parser = argparse.ArgumentParser(prog="nomina_cli", description="Nominapp MX por lotes, sin interfaz.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("nomina", help="Nómina periódica (ISR, IMSS, ISN y neto por empleado)")
+    p.add_argument("entrada", help="Empleados en CSV o Parquet")
+    p.add_argument("salida", help="Resultados en CSV o Parquet")
+    p.add_argument("--periodo", choices=[*PERIODOS_PAGO, "Mensual"], default="Quincenal")
+    p.add_argument("--criterio", choices=["Comercial (30)", "Fiscal (30.4)"], default="Comercial (30)")
+    p.add_argument("--metodo-isr", choices=METODOS_ISR, default=METODOS_ISR[0])
+    p.add_argument("--zona", default="Resto del País", help="Zona por omisión si el archivo no trae la columna")
+    p.add_argument("--prima-riesgo", type=float, default=0.5, help="Prima de riesgo %% por omisión")
+    p.add_argument("--tasa-isn", type=float, default=3.0, help="Tasa ISN %% por omisión")
+    p.add_argument("--ajuste", action="store_true", help="Cierre de mes: ajusta ISR contra lo acumulado")
+    p.add_argument("--centavos", action="store_true", help="Cálculo en centavos enteros, redondeado por concepto")
+    p.add_argument("--bloque", type=int, default=TAMANO_BLOQUE, help="Renglones por bloque")
+    p.add_argument("--procesos", type=int, default=1, help="Procesos en paralelo (uno por bloque en vuelo)")
+    p.add_argument("--acumulados", help="Libro SQLite de acumulados: registra la corrida y alimenta el ajuste")
+    p.add_argument("--anio", type=int, help="Ejercicio por omisión si el archivo no trae la columna anio (2026); "
+                                            "también el año en el libro de --acumulados")
+    p.add_argument("--parametros", help="Parámetros compilados (.npy de 'parametros') en lugar del registro interno")
+    p.add_argument("--mes", type=int, help="Mes de la nómina (con --acumulados)")
+    p.add_argument("--clave-periodo", help="Identificador del periodo dentro del mes, p. ej. Q1 (con --acumulados)")
+    p.set_defaults(func=_cmd_nomina)
+
+    p = sub.add_parser("recibos", help="Recibos por empleado (XML estilo CFDI y opcionalmente HTML) en un ZIP")
+    p.add_argument("entrada", help="Empleados en CSV o Parquet (como en 'nomina'; opcionales empleado, nombre, rfc, curp, nss)")
+    p.add_argument("salida", help="Archivo ZIP de salida ('-' para la salida estándar)")
+    p.add_argument("--periodo", choices=[*PERIODOS_PAGO, "Mensual"], default="Quincenal")
+    p.add_argument("--criterio", choices=["Comercial (30)", "Fiscal (30.4)"], default="Comercial (30)")
+    p.add_argument("--metodo-isr", choices=METODOS_ISR, default=METODOS_ISR[0])
+    p.add_argument("--zona", default="Resto del País", help="Zona por omisión si el archivo no trae la columna")
+    p.add_argument("--prima-riesgo", type=float, default=0.5, help="Prima de riesgo %% por omisión")
+    p.add_argument("--tasa-isn", type=float, default=3.0, help="Tasa ISN %% por omisión")
+    p.add_argument("--ajuste", action="store_true", help="Cierre de mes: ajusta ISR con los acumulados de la entrada")
+    p.add_argument("--anio", type=int, default=2026, help="Ejercicio por omisión si el archivo no trae la columna anio")
+    p.add_argument("--fecha-pago", help="Fecha de pago AAAA-MM-DD (hoy por omisión)")
+    p.add_argument("--emisor-rfc", default="XAXX010101000")
+    p.add_argument("--emisor-nombre", default="")
+    p.add_argument("--lugar-expedicion", default="00000", help="Código postal del lugar de expedición")
+    p.add_argument("--html", action="store_true", help="Agrega un recibo HTML imprimible por empleado")
+    p.add_argument("--parametros", help="Parámetros compilados (.npy de 'parametros') en lugar del registro interno")
+    p.add_argument("--bloque", type=int, default=5_000, help="Empleados por bloque (acota la memoria de documentos)")
+    p.add_argument("--procesos", type=int, default=1, help="Procesos en paralelo (uno por bloque en vuelo)")
+    p.set_defaults(func=_cmd_recibos)
+
+    p = sub.add_parser("bruto", help="Cálculo inverso: bruto que deja cada neto_objetivo del periodo")
+    p.add_argument("entrada", help="CSV/Parquet con neto_objetivo y opcionalmente antiguedad, prima_riesgo, zona, tasa_isn, anio")
+    p.add_argument("salida", help="Resultados en CSV o Parquet")
+    p.add_argument("--periodo", choices=[*PERIODOS_PAGO, "Mensual"], default="Quincenal")
+    p.add_argument("--criterio", choices=["Comercial (30)", "Fiscal (30.4)"], default="Comercial (30)")
+    p.add_argument("--metodo-isr", choices=METODOS_ISR, default=METODOS_ISR[0])
+    p.add_argument("--zona", default="Resto del País", help="Zona por omisión si el archivo no trae la columna")
+    p.add_argument("--prima-riesgo", type=float, default=0.5, help="Prima de riesgo %% por omisión")
+    p.add_argument("--tasa-isn", type=float, default=3.0, help="Tasa ISN %% por omisión")
+    p.add_argument("--anio", type=int, default=2026, help="Ejercicio por omisión si el archivo no trae la columna anio")
+    p.add_argument("--bloque", type=int, default=TAMANO_BLOQUE, help="Renglones por bloque")
+    p.add_argument("--procesos", type=int, default=1, help="Procesos en paralelo (uno por bloque en vuelo)")
+    p.add_argument("--parametros", help="Parámetros compilados (.npy de 'parametros') en lugar del registro interno")
+    p.set_defaults(func=_cmd_bruto)
+
+    p = sub.add_parser("finiquito", help="Finiquitos y liquidaciones masivos (desglose por concepto)")
+    p.add_argument("entrada", help="CSV/Parquet con f_alta, f_baja, sueldo_mensual y opcionalmente causa, zona, dias_vac_no_gozadas")
+    p.add_argument("salida", help="Resultados en CSV o Parquet")
+    p.add_argument("--causa", choices=["Renuncia Voluntaria", "Despido Injustificado"], default="Renuncia Voluntaria",
+                   help="Causa por omisión si el archivo no trae la columna")
+    p.add_argument("--zona", default="Resto del País", help="Zona por omisión si el archivo no trae la columna")
+    p.add_argument("--totales", action="store_true", help="Un renglón por empleado con totales, sin desglose")
+    p.add_argument("--anio", type=int, default=2026, help="Ejercicio por omisión si el archivo no trae la columna anio")
+    p.add_argument("--bloque", type=int, default=TAMANO_BLOQUE, help="Renglones por bloque")
+    p.add_argument("--procesos", type=int, default=1, help="Procesos en paralelo (uno por bloque en vuelo)")
+    p.add_argument("--parametros", help="Parámetros compilados (.npy de 'parametros') en lugar del registro interno")
+    p.set_defaults(func=_cmd_finiquito)
+
+    p = sub.add_parser("aguinaldo", help="Aguinaldo de fin de año (completo o proporcional) con su retención de ISR")
+    p.add_argument("entrada", help="CSV/Parquet con sueldo_mensual y opcionalmente f_ingreso o dias_trabajados, dias_ley, anio")
+    p.add_argument("salida", help="Resultados en CSV o Parquet")
+    p.add_argument("--metodo", choices=METODOS_AGUINALDO, default=METODOS_AGUINALDO[0], help="Método de retención de ISR")
+    p.add_argument("--dias-ley", type=int, default=15, help="Días de aguinaldo por omisión")
+    p.add_argument("--anio", type=int, default=2026, help="Año del aguinaldo si el archivo no trae la columna anio (también para el proporcional desde f_ingreso)")
+    p.add_argument("--bloque", type=int, default=TAMANO_BLOQUE, help="Renglones por bloque")
+    p.add_argument("--procesos", type=int, default=1, help="Procesos en paralelo (uno por bloque en vuelo)")
+    p.add_argument("--parametros", help="Parámetros compilados (.npy de 'parametros') en lugar del registro interno")
+    p.set_defaults(func=_cmd_aguinaldo)
+
+    p = sub.add_parser("anual", help="Cálculo anual de ISR (saldo a cargo / a favor por empleado)")
+    p.add_argument("salida", help="Resultados en CSV o Parquet")
+    p.add_argument("--anio", type=int, default=2026)
+    p.add_argument("--acumulados", help="Libro SQLite de acumulados con los periodos del año")
+    p.add_argument("--movimientos", help="CSV/Parquet con empleado, periodo, gravado e isr_retenido por renglón")
+    p.add_argument("--parametros", help="Parámetros compilados (.npy de 'parametros') en lugar del registro interno")
+    p.set_defaults(func=_cmd_anual)
+
+    p = sub.add_parser("bimestral", help="Liquidación bimestral IMSS / RCV / Infonavit con cambios de salario")
+    p.add_argument("movimientos", help="CSV/Parquet con empleado, fecha, sbc (0 = baja) y opcionalmente prima_riesgo")
+    p.add_argument("salida", help="Cuotas por empleado y concepto en CSV o Parquet")
+    p.add_argument("--anio", type=int, default=2026)
+    p.add_argument("--bimestre", type=int, required=True, choices=range(1, 7))
+    p.add_argument("--ausencias", help="CSV/Parquet con empleado, fecha y opcionalmente dias")
+    p.add_argument("--incapacidades", help="CSV/Parquet con empleado, fecha y opcionalmente dias")
+    p.add_argument("--prima-riesgo", type=float, default=0.5, help="Prima de riesgo %% si no viene en los movimientos")
+    p.add_argument("--parametros", help="Parámetros compilados (.npy de 'parametros') en lugar del registro interno")
+    p.set_defaults(func=_cmd_bimestral)
+
+    p = sub.add_parser("parametros", help="Compila los parámetros de todos los ejercicios a un .npy (para --parametros)")
+    p.add_argument("salida", help="Archivo .npy de salida")
+    p.set_defaults(func=_cmd_parametros)
+    return parser
+
+def main(argv=None):
+    args = construir_parser().parse_args(argv)
+    iniciar_rerun()
+    renglones, segundos = args.func(args)
+    terminar_rerun(f"cli/{args.comando}")
+    velocidad = renglones / segundos if segundos > 0 else float("inf")
+    print(f"{renglones:,} renglones en {segundos:.2f} s ({velocidad:,.0f} renglones/s) -> {args.salida}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
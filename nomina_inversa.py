@@ -0,0 +1,88 @@
+"""Cálculo inverso de nómina: qué sueldo bruto deja un neto dado.
+
+El neto del periodo es lineal por tramos en el sueldo diario. Los quiebres son el
+excedente de 3 UMA y el tope de 25 UMA del SBC, el límite de exención por salario mínimo
+y los límites inferiores de la tarifa de ISR. Para cada tramo se obtiene la recta con dos
+evaluaciones interiores del cálculo directo, se despeja el sueldo en forma cerrada y se
+conserva la primera solución que cae dentro de su tramo. Al final se verifica contra el
+cálculo directo.
+"""
+import numpy as np
+
+from nomina_motor import METODOS_ISR
+from nomina_lote import anios_lote, calcular_nomina_lote, dias_vacaciones_lote, salario_minimo_lote, tarifa_periodo_lote
+from nomina_parametros import parametros_lote
+
+TOLERANCIA = 0.005  # medio centavo
+
+
+def _quiebres(m, factor_int, sm_aplicable, limites_sd, uma):
+    """Inicio de cada tramo por renglón (m x tramos), ordenado."""
+    columnas = [np.zeros(m), 3*uma / factor_int, 25*uma / factor_int, sm_aplicable + 1.0,
+                np.broadcast_to(limites_sd, (m, limites_sd.shape[-1]))]
+    return np.sort(np.column_stack(columnas), axis=1)
+
+def calcular_bruto_desde_neto(datos=None, *, neto_objetivo=None, antiguedad=1, prima_riesgo=0.5, zona="Resto del País",
+                              tasa_isn=3.0, dias_pago=15, dias_mes_base=30.0, metodo_isr=METODOS_ISR[0], periodo=None, anio=2026,
+                              tabla_parametros=None):
+    """Sueldo diario, bruto y desglose completo que producen cada `neto_objetivo` del periodo.
+
+    Mismos parámetros que calcular_nomina_lote (nómina ordinaria, sin ajuste); `datos` puede
+    traer las columnas neto_objetivo, antiguedad, prima_riesgo, zona, tasa_isn y anio. Los netos
+    inalcanzables dejan todo el desglose en NaN (las banderas en False) y Verificado = False; un
+    neto de 0 sale de un sueldo de 0. Justo arriba del salario mínimo el neto
+    baja al dejar de estar exento, así que un mismo neto puede salir de dos sueldos: se elige
+    el menor.
+    """
+    entrada = {"neto_objetivo": neto_objetivo, "antiguedad": antiguedad, "prima_riesgo": prima_riesgo,
+               "zona": zona, "tasa_isn": tasa_isn, "anio": anio}
+    if datos is not None:
+        for col in entrada:
+            if col in datos: entrada[col] = datos[col].to_numpy()
+    neto = np.atleast_1d(np.asarray(entrada["neto_objetivo"], dtype=np.float64))
+    m = len(neto)
+    renglon = {k: np.broadcast_to(np.asarray(entrada[k]), (m,))
+               for k in ("antiguedad", "prima_riesgo", "zona", "tasa_isn", "anio")}
+    parametros = dict(dias_pago=dias_pago, dias_mes_base=dias_mes_base, metodo_isr=metodo_isr, periodo=periodo,
+                      tabla_parametros=tabla_parametros)
+    p = parametros_lote(anios_lote(renglon["anio"]), tabla_parametros)
+
+    # Límites de ISR expresados en sueldo diario, según la base que grava cada método
+    if metodo_isr == METODOS_ISR[1] and periodo is not None:
+        limites_sd = tarifa_periodo_lote(periodo, metodo_isr, p)[0] / dias_pago
+    else:
+        limites_sd = p.tarifa_isr()[0] / dias_mes_base
+    factor_int = 1 + ((15 + (dias_vacaciones_lote(renglon["antiguedad"], p)*0.25))/365)
+    inicio = _quiebres(m, factor_int, salario_minimo_lote(renglon["zona"], p), limites_sd, p.campo("uma"))
+    fin = np.column_stack([inicio[:, 1:], 2 * inicio[:, -1] + 1000.0])  # el último tramo es abierto
+    ancho = fin - inicio
+    tramos = inicio.shape[1]
+
+    # Recta de cada tramo a partir de dos puntos interiores (evita el salto en los extremos)
+    p1, p2 = inicio + 0.25 * ancho, inicio + 0.75 * ancho
+    por_tramo = {k: np.repeat(v, tramos) for k, v in renglon.items()}
+    n1 = calcular_nomina_lote(sueldo_diario=p1.ravel(), **por_tramo, **parametros)["Neto"].reshape(m, tramos)
+    n2 = calcular_nomina_lote(sueldo_diario=p2.ravel(), **por_tramo, **parametros)["Neto"].reshape(m, tramos)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pendiente = (n2 - n1) / (p2 - p1)
+        candidato = p1 + (neto[:, None] - n1) / pendiente
+    valido = (ancho > 0) & (pendiente > 0) & (candidato >= inicio) & (candidato <= fin)
+    valido[:, -1] = (pendiente[:, -1] > 0) & (candidato[:, -1] >= inicio[:, -1])
+    sueldo_diario = np.where(valido, candidato, np.inf).min(axis=1)
+    sueldo_diario[np.isinf(sueldo_diario)] = np.nan
+    sueldo_diario[neto == 0] = 0.0  # el redondeo de la recta puede dejar el cero fuera del tramo
+    sin_solucion = np.isnan(sueldo_diario)
+
+    resultado = calcular_nomina_lote(sueldo_diario=sueldo_diario, **renglon, **parametros)
+    if sin_solucion.any():
+        # Sin sueldo no hay desglose: también las cuotas que no dependen del SBC (cuota fija)
+        for k, v in resultado.items():
+            resultado[k] = np.where(sin_solucion, False if v.dtype == bool else np.nan, v)
+    verificado = np.abs(resultado["Neto"] - neto) <= TOLERANCIA
+    columnas = {"Neto Objetivo": neto, "Bruto Mensual": sueldo_diario * dias_mes_base}
+    columnas.update(resultado)
+    columnas["Verificado"] = verificado
+    if datos is None:
+        return columnas
+    import pandas as pd
+    return pd.DataFrame(columnas, index=datos.index)
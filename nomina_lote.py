@@ -0,0 +1,404 @@
+"""Cálculo de nómina por lotes: los mismos motores de nomina_motor sobre arreglos de NumPy.
+
+Cada función replica la aritmética de su contraparte escalar en el mismo orden de
+operaciones, de modo que los resultados coinciden al centavo. pandas sólo se importa cuando
+se entrega o se pide un DataFrame. Los parámetros del ejercicio (UMA, salarios mínimos,
+tarifa, CyV) salen de nomina_parametros y pueden variar por renglón.
+"""
+import numpy as np
+
+from nomina_metricas import medido
+from nomina_motor import TABLA_ISR_MENSUAL, METODOS_AGUINALDO, METODOS_ISR, TarifaISR
+from nomina_parametros import parametros_lote
+
+ZONAS_ZLFN = ("Frontera Norte (ZLFN)", "ZLFN")
+COLUMNA_EMPLEADO = "empleado"  # identificador del trabajador en archivos y resultados
+
+_PARAMETROS_2026 = parametros_lote(2026)
+
+
+def tabla_isr_arreglos(tabla_isr):
+    """Convierte una tarifa (lista de renglones o TarifaISR) en arreglos límite / cuota / porcentaje."""
+    if isinstance(tabla_isr, tuple): return tabla_isr  # ya en arreglos (p. ej. ParametrosLote.tarifa_isr)
+    if isinstance(tabla_isr, TarifaISR):
+        # Vista sin copia sobre los arreglos contiguos de la tarifa
+        return np.frombuffer(tabla_isr.limites), np.frombuffer(tabla_isr.cuotas), np.frombuffer(tabla_isr.porcs)
+    limites = np.array([row["limite"] for row in tabla_isr], dtype=np.float64)
+    cuotas = np.array([row["cuota"] for row in tabla_isr], dtype=np.float64)
+    porcs = np.array([row["porc"] for row in tabla_isr], dtype=np.float64)
+    return limites, cuotas, porcs
+
+_ISR_MENSUAL = tabla_isr_arreglos(TABLA_ISR_MENSUAL)
+
+
+# --- MOTORES VECTORIZADOS ---
+
+@medido()
+def calcular_isr_lote(base_gravable, tabla_isr=TABLA_ISR_MENSUAL):
+    if tabla_isr is TABLA_ISR_MENSUAL: limites, cuotas, porcs = _ISR_MENSUAL
+    else: limites, cuotas, porcs = tabla_isr_arreglos(tabla_isr)
+    base = np.asarray(base_gravable, dtype=np.float64)
+    # Renglón aplicable: último límite inferior <= base (igual que el recorrido escalar).
+    # Con una tarifa por renglón (n x renglones) se cuentan los límites <= base de cada uno.
+    if limites.ndim == 2: idx = (limites <= base[:, None]).sum(axis=1) - 1
+    else: idx = np.searchsorted(limites, base, side="right") - 1
+    dentro = idx >= 0
+    idx = np.maximum(idx, 0)
+    limite = np.where(dentro, _tomar(limites, idx), 0.0)
+    cuota = np.where(dentro, _tomar(cuotas, idx), 0.0)
+    porc = np.where(dentro, _tomar(porcs, idx), 0.0)
+    excedente = base - limite
+    marginal = excedente * porc
+    isr = marginal + cuota
+    return isr, {"Límite": limite, "Excedente": excedente, "Tasa (%)": porc, "Impuesto Marginal": marginal, "Cuota Fija": cuota, "ISR Determinado": isr}
+
+def _tomar(tabla, idx):
+    """tabla[idx] para una tabla común, o tabla[i, idx[i]] si cada renglón trae la suya."""
+    if tabla.ndim == 2: return np.take_along_axis(tabla, idx[:, None], axis=1)[:, 0]
+    return tabla[idx]
+
+def tasa_cyv_lote(sbc, parametros=_PARAMETROS_2026):
+    veces_uma = np.asarray(sbc, dtype=np.float64) / parametros.campo("uma")
+    topes = parametros.campo("cyv_topes")
+    # Primer tope >= veces UMA; arriba del último aplica la tasa máxima
+    if topes.ndim == 2: idx = (topes < veces_uma[:, None]).sum(axis=1)
+    else: idx = np.searchsorted(topes, veces_uma, side="left")
+    return _tomar(parametros.campo("cyv_tasas"), idx)
+
+def _sumar(conceptos):
+    total = 0.0
+    for monto in conceptos.values():
+        total = total + monto
+    return total
+
+@medido()
+def calcular_imss_obrero_lote(sbc, dias, parametros=_PARAMETROS_2026):
+    uma = parametros.campo("uma")
+    sbc = np.asarray(sbc, dtype=np.float64)
+    exc = np.maximum(0, sbc - (3*uma))
+    conceptos = {
+        "Enfermedad (Exc)": exc * 0.004 * dias,
+        "Prest. Dinero": sbc * 0.0025 * dias,
+        "Gastos Médicos": sbc * 0.00375 * dias,
+        "Invalidez y Vida": sbc * 0.00625 * dias,
+        "Cesantía y Vejez": sbc * 0.01125 * dias
+    }
+    return _sumar(conceptos), conceptos
+
+@medido()
+def calcular_imss_patronal_lote(sbc, dias, prima_riesgo, parametros=_PARAMETROS_2026):
+    uma = parametros.campo("uma")
+    sbc = np.asarray(sbc, dtype=np.float64)
+    exc = np.maximum(0, sbc - (3*uma))
+    tasa_cyv = tasa_cyv_lote(sbc, parametros)
+    conceptos = {
+        "Cuota Fija": np.broadcast_to((uma * 0.204) * dias, sbc.shape),
+        "Excedente 3 UMA": exc * 0.011 * dias,
+        "Prest. Dinero": sbc * 0.007 * dias,
+        "Gastos Médicos": sbc * 0.0105 * dias,
+        "Riesgo Trabajo": sbc * (np.asarray(prima_riesgo, dtype=np.float64)/100) * dias,
+        "Invalidez y Vida": sbc * 0.0175 * dias,
+        "Guarderías": sbc * 0.01 * dias,
+        "Retiro (SAR)": sbc * 0.02 * dias,
+        "Cesantía y Vejez": sbc * tasa_cyv * dias,
+        "Infonavit": sbc * 0.05 * dias
+    }
+    return _sumar(conceptos), conceptos
+
+def dias_vacaciones_lote(anios_antiguedad, parametros=_PARAMETROS_2026):
+    vacaciones = parametros.tabla["vacaciones"]
+    anios = np.trunc(np.asarray(anios_antiguedad, dtype=np.float64))
+    return vacaciones[parametros.indice, np.clip(anios, 0, vacaciones.shape[1] - 1).astype(np.intp)]
+
+def salario_minimo_lote(zona, parametros=_PARAMETROS_2026):
+    """Salario mínimo por renglón; `zona` puede ser la etiqueta de la UI o un booleano ZLFN."""
+    zona = np.asarray(zona)
+    es_zlfn = zona if zona.dtype == bool else np.isin(zona, ZONAS_ZLFN)
+    return np.where(es_zlfn, parametros.campo("sm_zlfn"), parametros.campo("sm_general"))
+
+def tarifa_periodo_lote(periodo, metodo_isr, parametros):
+    """Tarifa de ISR del periodo en arreglos, ya compilada en `parametros` (la misma fuente que
+    UMA e IMSS, aunque venga de un .npy); por renglón si los años se mezclan."""
+    return parametros.tarifa_isr_periodo(periodo, metodo_isr)
+
+def anios_lote(anio):
+    """Ejercicio del lote: un escalar si todos los renglones son del mismo año (el caso normal,
+    con tarifa común); si se mezclan, el arreglo por renglón. Un lote vacío queda como arreglo."""
+    anios = np.asarray(anio)
+    if anios.size and anios.ndim and (anios == anios.flat[0]).all(): return anios.flat[0]
+    return anios
+
+
+# --- NÓMINA PERIÓDICA POR LOTES ---
+
+_COLUMNAS_ENTRADA = ("sueldo_diario", "sueldo_mensual", "monto_periodo", "antiguedad", "prima_riesgo", "zona",
+                     "tasa_isn", "es_ajuste", "ingreso_acumulado_prev", "isr_retenido_prev", "anio")
+
+@medido()
+def calcular_nomina_lote(datos=None, *, sueldo_diario=None, sueldo_mensual=None, monto_periodo=None, antiguedad=1,
+                         prima_riesgo=0.5, zona="Resto del País", tasa_isn=3.0, dias_pago=15, dias_mes_base=30.0,
+                         es_ajuste=False, ingreso_acumulado_prev=0.0, isr_retenido_prev=0.0,
+                         metodo_isr=METODOS_ISR[0], periodo=None, anio=2026, tabla_parametros=None, desglose_isr=False):
+    """Nómina periódica para todos los empleados a la vez (equivale a calcular_nomina_periodica).
+
+    `datos` puede ser un DataFrame con columnas de mismo nombre que los argumentos; las que falten
+    se toman de los argumentos. El ingreso se da como sueldo_diario, sueldo_mensual (Bruto Mensual)
+    o monto_periodo (Por Periodo). Sin DataFrame, los argumentos aceptan escalares o arreglos.
+    `metodo_isr` y `periodo` tienen el mismo sentido que en calcular_nomina_periodica.
+    `anio` (o la columna anio) elige el ejercicio de cada renglón; `tabla_parametros` permite
+    usar una tabla cargada con nomina_parametros.cargar_parametros en vez del registro interno.
+    Con `desglose_isr` se agregan las columnas "ISR: ..." de la auditoría de la tarifa (base,
+    límite, excedente, tasa, cuota fija), las mismas que calcular_nomina_periodica.
+    Devuelve un DataFrame con un renglón por empleado (mismo índice que `datos`) o un dict de arreglos.
+    """
+    entrada = {"sueldo_diario": sueldo_diario, "sueldo_mensual": sueldo_mensual, "monto_periodo": monto_periodo,
+               "antiguedad": antiguedad, "prima_riesgo": prima_riesgo, "zona": zona, "tasa_isn": tasa_isn,
+               "es_ajuste": es_ajuste, "ingreso_acumulado_prev": ingreso_acumulado_prev,
+               "isr_retenido_prev": isr_retenido_prev, "anio": anio}
+    if datos is not None:
+        for col in _COLUMNAS_ENTRADA:
+            if col in datos: entrada[col] = datos[col].to_numpy()
+    if entrada["sueldo_diario"] is not None: sd = np.asarray(entrada["sueldo_diario"], dtype=np.float64)
+    elif entrada["sueldo_mensual"] is not None: sd = np.asarray(entrada["sueldo_mensual"], dtype=np.float64) / dias_mes_base
+    elif entrada["monto_periodo"] is not None: sd = np.asarray(entrada["monto_periodo"], dtype=np.float64) / dias_pago
+    else: raise ValueError("Falta el ingreso: sueldo_diario, sueldo_mensual o monto_periodo")
+
+    n = sd.shape
+    p = parametros_lote(anios_lote(entrada["anio"]), tabla_parametros)
+    sm_aplicable = salario_minimo_lote(entrada["zona"], p)
+    prima = np.broadcast_to(np.asarray(entrada["prima_riesgo"], dtype=np.float64), n)
+    isn_tasa = np.broadcast_to(np.asarray(entrada["tasa_isn"], dtype=np.float64), n)
+    es_ajuste = np.broadcast_to(np.asarray(entrada["es_ajuste"], dtype=bool), n)
+
+    dias_vac = dias_vacaciones_lote(entrada["antiguedad"], p)
+    factor_int = 1 + ((15 + (dias_vac*0.25))/365)
+    sbc = np.minimum(sd * factor_int, p.campo("uma") * 25)
+    bruto_periodo = sd * dias_pago
+    imss_obrero, conceptos_obr = calcular_imss_obrero_lote(sbc, dias_pago, p)
+
+    es_salario_minimo = sd <= (sm_aplicable + 1.0)
+    # Ajuste: ISR del acumulado del mes menos lo ya retenido; si no, proyección mensual prorrateada.
+    # Ambas bases pasan por una sola búsqueda en la tarifa.
+    total_ingreso_mensual = np.asarray(entrada["ingreso_acumulado_prev"], dtype=np.float64) + bruto_periodo
+    base_mensual = np.where(es_ajuste, total_ingreso_mensual, sd * dias_mes_base)
+    isr_mensual, _ = calcular_isr_lote(base_mensual, p.tarifa_isr())
+    isr_ajuste = isr_mensual - np.asarray(entrada["isr_retenido_prev"], dtype=np.float64)
+    usa_tarifa_periodo = metodo_isr == METODOS_ISR[1] and periodo is not None
+    if usa_tarifa_periodo:
+        isr_ordinario, desglose_periodo = calcular_isr_lote(bruto_periodo, tarifa_periodo_lote(periodo, metodo_isr, p))
+    else:
+        isr_ordinario = isr_mensual * (dias_pago / dias_mes_base)
+    isr_periodo = np.where(es_salario_minimo, 0.0, np.where(es_ajuste, isr_ajuste, isr_ordinario))
+
+    neto = bruto_periodo - imss_obrero - isr_periodo
+    imss_patronal, conceptos_pat = calcular_imss_patronal_lote(sbc, dias_pago, prima, p)
+    isn = bruto_periodo * (isn_tasa / 100)
+    costo_total = bruto_periodo + imss_patronal + isn
+
+    columnas = {
+        "Sueldo Diario": sd,
+        "SBC": sbc,
+        "Salario Mínimo": np.broadcast_to(es_salario_minimo, n),
+        "Ajuste": es_ajuste,
+        "Bruto": bruto_periodo,
+        "ISR": isr_periodo,
+        "IMSS Obrero": imss_obrero,
+    }
+    columnas.update({f"Obrero: {k}": v for k, v in conceptos_obr.items()})
+    columnas["IMSS Patronal"] = imss_patronal
+    columnas.update({f"Patronal: {k}": np.broadcast_to(v, n) for k, v in conceptos_pat.items()})
+    columnas.update({"ISN": isn, "Neto": neto, "Costo Total": costo_total})
+    if desglose_isr:
+        # Como el escalar: el salario mínimo se audita con la proyección mensual aunque sea ajuste
+        por_acumulado = es_ajuste & ~es_salario_minimo
+        base_isr = np.where(por_acumulado, total_ingreso_mensual, sd * dias_mes_base)
+        _, desglose = calcular_isr_lote(base_isr, p.tarifa_isr())
+        if usa_tarifa_periodo:
+            por_periodo = ~es_ajuste & ~es_salario_minimo
+            base_isr = np.where(por_periodo, bruto_periodo, base_isr)
+            desglose = {k: np.where(por_periodo, desglose_periodo[k], v) for k, v in desglose.items()}
+        columnas["ISR: Base"] = base_isr
+        columnas.update({f"ISR: {k}": v for k, v in desglose.items()})
+    if datos is None:
+        return columnas
+    import pandas as pd
+    return pd.DataFrame(columnas, index=datos.index)
+
+
+# --- FINIQUITOS POR LOTES ---
+
+CONCEPTOS_FINIQUITO = ("Aguinaldo Proporcional", "Vacaciones (Prop + Pend)", "Prima Vacacional",
+                       "Pagos por Separación (Liq + Antig)")
+
+def _como_dias(fechas):
+    return np.asarray(fechas, dtype="datetime64[D]")
+
+def aniversario_lote(anio, f_alta):
+    """Aniversario de cada `f_alta` en el año `anio` (datetime64[Y]); el día se limita al fin de mes (29/02 -> 28/02)."""
+    alta_mes = f_alta.astype("datetime64[M]")
+    mes = alta_mes - f_alta.astype("datetime64[Y]").astype("datetime64[M]")
+    dia = f_alta - alta_mes.astype("datetime64[D]")
+    inicio_mes = anio.astype("datetime64[M]") + mes
+    dias_mes = (inicio_mes + 1).astype("datetime64[D]") - inicio_mes.astype("datetime64[D]")
+    return inicio_mes.astype("datetime64[D]") + np.minimum(dia, dias_mes - 1)
+
+def dias_finiquito_lote(f_alta, f_baja, parametros=_PARAMETROS_2026):
+    """Equivalente vectorizado de dias_finiquito sobre arreglos de fechas."""
+    f_alta, f_baja = _como_dias(f_alta), _como_dias(f_baja)
+    antiguedad_dias_total = (f_baja - f_alta).astype(np.int64) + 1
+    anios_completos = np.trunc(antiguedad_dias_total / 365.25)
+
+    # Aguinaldo Prop: Días del año en curso
+    anio_baja = f_baja.astype("datetime64[Y]")
+    fecha_inicio_ag = np.maximum(f_alta, anio_baja.astype("datetime64[D]"))
+    dias_ag_trab = (f_baja - fecha_inicio_ag).astype(np.int64) + 1
+    prop_agui = (dias_ag_trab / 365) * 15
+
+    # Vacaciones Prop: Días desde último aniversario
+    fecha_aniversario = aniversario_lote(anio_baja, f_alta)
+    anterior = aniversario_lote(anio_baja - 1, f_alta)
+    fecha_aniversario = np.where(fecha_aniversario > f_baja, anterior, fecha_aniversario)
+    dias_desde_aniversario = (f_baja - fecha_aniversario).astype(np.int64) + 1
+    dias_ley_tocan = dias_vacaciones_lote(anios_completos + 1, parametros)
+    prop_vac = (dias_desde_aniversario / 365) * dias_ley_tocan
+    return {"antiguedad_dias_total": antiguedad_dias_total, "anios_completos": anios_completos,
+            "prop_agui": prop_agui, "prop_vac": prop_vac, "dias_ley_tocan": dias_ley_tocan}
+
+@medido()
+def calcular_finiquito_lote(datos=None, *, causa="Renuncia Voluntaria", f_alta=None, f_baja=None, sueldo_mensual=None,
+                            zona="Resto del País", dias_vac_no_gozadas=0.0, detalle=True, anio=2026,
+                            tabla_parametros=None):
+    """Finiquitos y liquidaciones de muchos empleados a la vez (equivale a calcular_finiquito).
+
+    `datos` puede ser un DataFrame con columnas causa, f_alta, f_baja, sueldo_mensual, zona y
+    dias_vac_no_gozadas (y anio, el ejercicio de la baja). Con `detalle` regresa la tabla por concepto (Concepto, Bruto, Exento,
+    ISR Aprox, Neto) de cada empleado, repitiendo su índice, con el mismo orden y renglones que
+    la hoja de liquidación; si no, un renglón por empleado con los totales. `tabla_parametros`
+    como en calcular_nomina_lote.
+    """
+    import pandas as pd
+    entrada = {"causa": causa, "f_alta": f_alta, "f_baja": f_baja, "sueldo_mensual": sueldo_mensual, "zona": zona,
+               "dias_vac_no_gozadas": dias_vac_no_gozadas, "anio": anio}
+    if datos is not None:
+        for col in entrada:
+            if col in datos: entrada[col] = datos[col].to_numpy()
+    sueldo_men = np.asarray(entrada["sueldo_mensual"], dtype=np.float64)
+    n = sueldo_men.shape
+    indice = datos.index if datos is not None else pd.RangeIndex(len(sueldo_men))
+    p = parametros_lote(anios_lote(entrada["anio"]), tabla_parametros)
+    dias = dias_finiquito_lote(entrada["f_alta"], entrada["f_baja"], p)
+    antiguedad_dias_total, anios_completos = dias["antiguedad_dias_total"], dias["anios_completos"]
+    total_dias_vac = dias["prop_vac"] + np.asarray(entrada["dias_vac_no_gozadas"], dtype=np.float64)
+    uma = p.campo("uma")
+
+    sd = sueldo_men / 30
+    factor_int = 1 + ((15 + (dias["dias_ley_tocan"]*0.25))/365)
+    sdi = sd * factor_int
+
+    monto_aguinaldo = dias["prop_agui"] * sd
+    monto_vac = total_dias_vac * sd
+    monto_prima_vac = monto_vac * 0.25
+
+    tope_prima = 2 * salario_minimo_lote(entrada["zona"], p)
+    base_prima = np.minimum(sd, tope_prima)
+    despido = np.broadcast_to(np.asarray(entrada["causa"]) == "Despido Injustificado", n)
+    prima_antiguedad = np.where(despido | (anios_completos >= 15), (antiguedad_dias_total / 365) * 12 * base_prima, 0.0)
+    indemnizacion = np.where(despido, 3 * 30 * sdi, 0.0)
+    veinte_dias = np.where(despido, 20 * (antiguedad_dias_total / 365) * sdi, 0.0)
+
+    # IMPUESTOS
+    isr_ord_men, desglose_isr_men = calcular_isr_lote(sueldo_men, p.tarifa_isr())
+    tasa_marginal = desglose_isr_men["Tasa (%)"]
+
+    ex_agui = np.minimum(monto_aguinaldo, 30*uma)
+    ex_pv = np.minimum(monto_prima_vac, 15*uma)
+    tope_90_umas = 90 * uma * anios_completos
+    total_separacion = prima_antiguedad + indemnizacion + veinte_dias
+    ex_separacion = np.minimum(total_separacion, tope_90_umas)
+
+    gravado_sep = total_separacion - ex_separacion
+    tasa_efectiva = np.divide(isr_ord_men, sueldo_men, out=np.zeros(n), where=sueldo_men > 0)
+    isr_separacion = gravado_sep * tasa_efectiva
+
+    # Empleados x conceptos, en el orden de CONCEPTOS_FINIQUITO
+    bruto = np.stack([monto_aguinaldo, monto_vac, monto_prima_vac, total_separacion], axis=1)
+    exento = np.stack([ex_agui, np.zeros(n), ex_pv, ex_separacion], axis=1)
+    isr = np.stack([(monto_aguinaldo-ex_agui)*tasa_marginal, monto_vac*tasa_marginal,
+                    (monto_prima_vac-ex_pv)*tasa_marginal, isr_separacion], axis=1)
+    neto = bruto - isr
+
+    if not detalle:
+        total_pagar = total_separacion + monto_aguinaldo + monto_vac + monto_prima_vac
+        total_isr = (isr[:, 0] + isr[:, 1] + isr[:, 2]) + isr_separacion
+        return pd.DataFrame({"Total Bruto": total_pagar, "Total ISR": total_isr, "Total Neto": total_pagar - total_isr},
+                            index=indice)
+
+    # La separación sólo aparece cuando hubo pagos por ese concepto
+    incluir = np.ones(bruto.shape, dtype=bool)
+    incluir[:, 3] = total_separacion > 0
+    incluir = incluir.ravel()
+    return pd.DataFrame({
+        "Concepto": np.tile(np.array(CONCEPTOS_FINIQUITO, dtype=object), len(sueldo_men))[incluir],
+        "Bruto": bruto.ravel()[incluir],
+        "Exento": exento.ravel()[incluir],
+        "ISR Aprox": isr.ravel()[incluir],
+        "Neto": neto.ravel()[incluir],
+    }, index=indice.repeat(len(CONCEPTOS_FINIQUITO))[incluir])
+
+
+# --- AGUINALDO POR LOTES ---
+
+def dias_aguinaldo_lote(f_ingreso, anio=2026):
+    """Días trabajados en `anio` (escalar o uno por renglón) para el aguinaldo proporcional.
+
+    365 (o 366) si ingresó antes del año; 0 si ingresó después, sin días negativos.
+    """
+    anio = np.asarray(anio, dtype=np.int64) - 1970
+    inicio = anio.astype("datetime64[Y]").astype("datetime64[D]")
+    siguiente = (anio + 1).astype("datetime64[Y]").astype("datetime64[D]")
+    f_ingreso = np.maximum(_como_dias(f_ingreso), inicio)
+    return np.maximum((siguiente - f_ingreso).astype(np.int64), 0)
+
+@medido()
+def calcular_aguinaldo_lote(datos=None, *, sueldo_mensual=None, dias_ley=15, dias_trabajados=365, f_ingreso=None,
+                            metodo=METODOS_AGUINALDO[0], anio=2026, tabla_parametros=None):
+    """Aguinaldo de toda la plantilla (equivale a calcular_aguinaldo).
+
+    El periodo a pagar es `dias_trabajados` o, si se da, se calcula desde `f_ingreso` (año
+    completo o proporcional). Las dos bases de ISR de cada empleado (sueldo solo y sueldo más
+    el gravado, o su parte mensualizada en el método del art. 174) se resuelven en una sola
+    búsqueda sobre la tarifa. `anio` (o la columna anio) elige el ejercicio de cada renglón;
+    `tabla_parametros` como en calcular_nomina_lote.
+    """
+    entrada = {"sueldo_mensual": sueldo_mensual, "dias_ley": dias_ley, "dias_trabajados": dias_trabajados,
+               "f_ingreso": f_ingreso, "anio": anio}
+    if datos is not None:
+        for col in entrada:
+            if col in datos: entrada[col] = datos[col].to_numpy()
+    sueldo_mensual = np.asarray(entrada["sueldo_mensual"], dtype=np.float64)
+    n = sueldo_mensual.shape
+    p = parametros_lote(anios_lote(entrada["anio"]), tabla_parametros)
+    if entrada["f_ingreso"] is not None: dias_trabajados = dias_aguinaldo_lote(entrada["f_ingreso"], entrada["anio"])
+    else: dias_trabajados = np.asarray(entrada["dias_trabajados"], dtype=np.float64)
+
+    sd = sueldo_mensual / 30
+    aguinaldo_bruto = (dias_trabajados/365) * np.asarray(entrada["dias_ley"], dtype=np.float64) * sd
+    exento = 30 * p.campo("uma")
+    gravado = np.maximum(0, aguinaldo_bruto - exento)
+    adicional = gravado / 365 * 30.4 if metodo == METODOS_AGUINALDO[1] else gravado
+    tarifa = p.tarifa_isr()
+    if p.por_renglon: tarifa = tuple(np.concatenate([t, t]) for t in tarifa)  # una por base
+    isr, _ = calcular_isr_lote(np.concatenate([sueldo_mensual, sueldo_mensual + adicional]), tarifa)
+    isr_base, isr_total = isr[:len(sueldo_mensual)], isr[len(sueldo_mensual):]
+    if metodo == METODOS_AGUINALDO[1]:
+        tasa = np.divide(isr_total - isr_base, adicional, out=np.zeros(n), where=adicional > 0)
+        isr_retener = gravado * tasa
+    else:
+        isr_retener = isr_total - isr_base
+    neto = aguinaldo_bruto - isr_retener
+    columnas = {"Días Trabajados": np.broadcast_to(dias_trabajados, n), "Aguinaldo Bruto": aguinaldo_bruto,
+                "Exento": np.minimum(exento, aguinaldo_bruto), "Gravado": gravado, "ISR": isr_retener, "Neto": neto}
+    if datos is None:
+        return columnas
+    import pandas as pd
+    return pd.DataFrame(columnas, index=datos.index)
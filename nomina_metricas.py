@@ -0,0 +1,132 @@
+"""Instrumentación opcional: tiempo y número de llamadas de los motores y del render.
+
+Se activa al arrancar el proceso con NOMINA_METRICAS=1. Apagada, `medido` regresa la función
+sin envolver y `tramo` un contexto vacío compartido, así que no cuesta nada en los motores.
+Con NOMINA_METRICAS_ARCHIVO cada rerun (o corrida de la CLI) se escribe al terminar: un
+renglón JSON por rerun o, si la ruta termina en .prom, los contadores acumulados en formato
+de texto de Prometheus (para el textfile collector de node_exporter).
+
+Los tiempos son inclusivos: un motor llamado dentro de otro cuenta en ambos. En corridas con
+varios procesos sólo se registra lo que ocurre en el proceso principal.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from functools import wraps
+
+ACTIVO = os.environ.get("NOMINA_METRICAS", "") not in ("", "0")
+ARCHIVO = os.environ.get("NOMINA_METRICAS_ARCHIVO")
+_VACIO = nullcontext()
+
+
+class Registro:
+    """Llamadas, segundos y máximo por nombre, más los tramos del rerun en curso de cada hilo."""
+
+    def __init__(self):
+        self._candado = threading.Lock()
+        self._local = threading.local()
+        self.totales = {}
+
+    def anotar(self, nombre, segundos):
+        with self._candado:
+            t = self.totales.get(nombre)
+            if t is None: t = self.totales[nombre] = [0, 0.0, 0.0]
+            t[0] += 1
+            t[1] += segundos
+            if segundos > t[2]: t[2] = segundos
+        tramos = getattr(self._local, "tramos", None)
+        if tramos is not None: tramos.append((nombre, segundos))
+
+    def iniciar_rerun(self):
+        self._local.tramos = []
+        self._local.inicio = time.perf_counter()
+
+    def terminar_rerun(self, etiqueta):
+        """Resumen del rerun del hilo actual: {nombre: [llamadas, segundos]} en orden de aparición."""
+        tramos = getattr(self._local, "tramos", None) or []
+        total = time.perf_counter() - getattr(self._local, "inicio", time.perf_counter())
+        self._local.tramos = None
+        por_nombre = {}
+        for nombre, segundos in tramos:
+            t = por_nombre.setdefault(nombre, [0, 0.0])
+            t[0] += 1
+            t[1] += segundos
+        self.anotar(f"rerun/{etiqueta}", total)
+        return {"ts": time.time(), "etiqueta": etiqueta, "total_s": total, "tramos": por_nombre}
+
+    def texto_prometheus(self):
+        with self._candado:
+            totales = {k: list(v) for k, v in self.totales.items()}
+        lineas = []
+        for metrica, tipo, ayuda, i in (("nomina_llamadas_total", "counter", "Llamadas por función o sección.", 0),
+                                        ("nomina_segundos_total", "counter", "Segundos acumulados (inclusivos).", 1),
+                                        ("nomina_segundos_max", "gauge", "Llamada más lenta en segundos.", 2)):
+            lineas += [f"# HELP {metrica} {ayuda}", f"# TYPE {metrica} {tipo}"]
+            for nombre, t in totales.items():
+                etiqueta = nombre.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+                lineas.append(f'{metrica}{{nombre="{etiqueta}"}} {t[i]!r}')
+        return "\n".join(lineas) + "\n"
+
+    def escribir(self, resumen, ruta=ARCHIVO):
+        """Exporta `resumen` (JSON-lines) o los contadores (.prom) a `ruta`, si hay ruta."""
+        if not ruta: return
+        if ruta.endswith(".prom"):
+            # Reemplazo atómico: el collector nunca lee un archivo a medias
+            temporal = f"{ruta}.{os.getpid()}.tmp"
+            with open(temporal, "w", encoding="utf-8") as f:
+                f.write(self.texto_prometheus())
+            os.replace(temporal, ruta)
+        else:
+            renglon = json.dumps(resumen, ensure_ascii=False) + "\n"
+            with self._candado, open(ruta, "a", encoding="utf-8") as f:
+                f.write(renglon)
+
+
+REGISTRO = Registro()
+
+
+class _Tramo:
+    __slots__ = ("nombre", "inicio")
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        REGISTRO.anotar(self.nombre, time.perf_counter() - self.inicio)
+
+
+def tramo(nombre):
+    """Contexto que mide su bloque bajo `nombre` (vacío si la instrumentación está apagada)."""
+    return _Tramo(nombre) if ACTIVO else _VACIO
+
+def medido(nombre=None):
+    """Decorador que mide cada llamada; el nombre por omisión es p. ej. 'motor/calcular_isr_engine'."""
+    def decorar(funcion):
+        if not ACTIVO:
+            return funcion
+        etiqueta = nombre or f"{funcion.__module__.removeprefix('nomina_')}/{funcion.__qualname__}"
+        @wraps(funcion)
+        def envuelta(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                REGISTRO.anotar(etiqueta, time.perf_counter() - inicio)
+        return envuelta
+    return decorar
+
+def iniciar_rerun():
+    if ACTIVO: REGISTRO.iniciar_rerun()
+
+def terminar_rerun(etiqueta):
+    """Cierra el rerun del hilo actual, lo exporta y regresa su resumen (None si está apagado)."""
+    if not ACTIVO: return None
+    resumen = REGISTRO.terminar_rerun(etiqueta)
+    REGISTRO.escribir(resumen)
+    return resumen
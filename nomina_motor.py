@@ -0,0 +1,425 @@
+"""Motores de cálculo de Nominapp MX.
+
+Biblioteca de Python puro: no importa streamlit, pandas ni altair y no tiene efectos al
+importarse, de modo que los procesos por lotes pueden reutilizarla con arranque mínimo.
+"""
+from array import array
+from bisect import bisect_right
+from datetime import date
+from functools import lru_cache
+
+from nomina_metricas import medido
+
+__all__ = [
+    "VALORES_2026", "TABLA_ISR_MENSUAL", "TABLA_CYV", "TASA_CYV_MAXIMA", "PERIODOS_PAGO",
+    "VALORES_POR_ANIO", "CYV_POR_ANIO", "valores_anio",
+    "calcular_isr_engine", "calcular_imss_obrero", "calcular_imss_patronal", "obtener_dias_vacaciones_ley",
+    "dias_mes_por_criterio", "dias_del_periodo", "calcular_nomina_periodica",
+    "TARIFAS_ISR_MENSUAL", "METODOS_ISR", "TarifaISR", "tarifa_del_periodo", "tarifa_isr",
+    "METODOS_AGUINALDO", "calcular_aguinaldo", "aniversario", "dias_finiquito", "calcular_finiquito",
+    "LIMITE_AJUSTE_ANUAL", "tarifa_isr_anual", "calcular_ajuste_anual",
+]
+
+# --- DATOS OFICIALES 2026 ---
+VALORES_2026 = {
+    "UMA": 117.31,
+    "SALARIO_MINIMO_GENERAL": 315.04,
+    "SALARIO_MINIMO_ZLFN": 440.87,
+}
+
+TABLA_ISR_MENSUAL = [
+    {"limite": 0.01, "cuota": 0.00, "porc": 0.0192},
+    {"limite": 844.60, "cuota": 16.22, "porc": 0.0640},
+    {"limite": 7168.52, "cuota": 420.95, "porc": 0.1088},
+    {"limite": 12598.03, "cuota": 1011.68, "porc": 0.1600},
+    {"limite": 14644.65, "cuota": 1339.14, "porc": 0.1792},
+    {"limite": 17533.65, "cuota": 1856.84, "porc": 0.2136},
+    {"limite": 35362.84, "cuota": 5665.16, "porc": 0.2352},
+    {"limite": 55736.69, "cuota": 10457.09, "porc": 0.3000},
+    {"limite": 106410.51, "cuota": 25659.23, "porc": 0.3200},
+    {"limite": 141880.67, "cuota": 37009.69, "porc": 0.3400},
+    {"limite": 425642.00, "cuota": 133488.54, "porc": 0.3500},
+]
+
+# Cesantía y Vejez patronal: (tope en veces UMA, tasa). Arriba del último tope aplica la máxima.
+TABLA_CYV = [
+    (1.0, 0.0315),
+    (1.5, 0.0420),
+    (2.0, 0.0655),
+    (2.5, 0.0796),
+    (3.0, 0.0937),
+    (3.5, 0.1077),
+    (4.0, 0.11875),
+]
+TASA_CYV_MAXIMA = 0.11875
+
+# --- EJERCICIOS ANTERIORES (recálculos y auditorías retroactivas) ---
+VALORES_POR_ANIO = {
+    2023: {"UMA": 103.74, "SALARIO_MINIMO_GENERAL": 207.44, "SALARIO_MINIMO_ZLFN": 312.41},
+    2024: {"UMA": 108.57, "SALARIO_MINIMO_GENERAL": 248.93, "SALARIO_MINIMO_ZLFN": 374.89},
+    2025: {"UMA": 113.14, "SALARIO_MINIMO_GENERAL": 278.80, "SALARIO_MINIMO_ZLFN": 419.88},
+    2026: VALORES_2026,
+}
+
+# Tarifa mensual vigente de 2023 a 2025 (la de 2026 se actualizó por inflación)
+TABLA_ISR_MENSUAL_2023 = [
+    {"limite": 0.01, "cuota": 0.00, "porc": 0.0192},
+    {"limite": 746.05, "cuota": 14.32, "porc": 0.0640},
+    {"limite": 6332.06, "cuota": 371.83, "porc": 0.1088},
+    {"limite": 11128.02, "cuota": 893.63, "porc": 0.1600},
+    {"limite": 12935.83, "cuota": 1182.88, "porc": 0.1792},
+    {"limite": 15487.72, "cuota": 1640.18, "porc": 0.2136},
+    {"limite": 31236.50, "cuota": 5004.12, "porc": 0.2352},
+    {"limite": 49233.01, "cuota": 9236.89, "porc": 0.3000},
+    {"limite": 93993.91, "cuota": 22665.17, "porc": 0.3200},
+    {"limite": 125325.21, "cuota": 32691.18, "porc": 0.3400},
+    {"limite": 375975.62, "cuota": 117912.32, "porc": 0.3500},
+]
+
+# Tarifas mensuales por ejercicio (Anexo 8 RMF)
+TARIFAS_ISR_MENSUAL = {2023: TABLA_ISR_MENSUAL_2023, 2024: TABLA_ISR_MENSUAL_2023, 2025: TABLA_ISR_MENSUAL_2023,
+                       2026: TABLA_ISR_MENSUAL}
+
+# Escalera de CyV patronal de la reforma de pensiones (transitorios LSS): (tabla, tasa máxima)
+_TOPES_CYV = (1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0)
+CYV_POR_ANIO = {
+    2023: (list(zip(_TOPES_CYV, (0.03150, 0.03544, 0.04426, 0.04954, 0.05307, 0.05559, 0.05747))), 0.06422),
+    2024: (list(zip(_TOPES_CYV, (0.03150, 0.03676, 0.04851, 0.05556, 0.06026, 0.06361, 0.06613))), 0.07513),
+    2025: (list(zip(_TOPES_CYV, (0.03150, 0.03809, 0.05277, 0.06157, 0.06745, 0.07164, 0.07479))), 0.08603),
+    2026: (TABLA_CYV, TASA_CYV_MAXIMA),
+}
+
+def valores_anio(anio):
+    """UMA y salarios mínimos del ejercicio `anio`."""
+    if anio not in VALORES_POR_ANIO:
+        raise ValueError(f"No hay parámetros para {anio}")
+    return VALORES_POR_ANIO[anio]
+
+PERIODOS_PAGO = {"Quincenal": 15, "Decenal": 10, "Semanal": 7}  # "Mensual" paga los días base del criterio
+
+# Proyección: ISR mensual del sueldo proyectado, prorrateado a los días pagados.
+# Tarifa SAT: tarifa del periodo (mensual / 30.4 x días, redondeada) aplicada al ingreso del periodo.
+METODOS_ISR = ("Proyección Mensual", "Tarifa del Periodo (SAT)")
+
+# Art. 96 LISR: ISR del mes con el aguinaldo gravado sumado, menos el ISR del sueldo solo.
+# Art. 174 RLISR: el gravado se mensualiza (/ 365 x 30.4) y la tasa resultante se aplica al gravado.
+METODOS_AGUINALDO = ("Art. 96 LISR", "Art. 174 RLISR")
+
+# Art. 97 LISR: el patrón no hace el cálculo anual si el ingreso del año excede este monto
+LIMITE_AJUSTE_ANUAL = 400_000.00
+
+# --- MOTORES DE CÁLCULO ---
+
+@medido()
+def calcular_isr_engine(base_gravable, tabla_isr):
+    if isinstance(tabla_isr, TarifaISR): return tabla_isr.desglose(base_gravable)
+    limite, cuota, porc = 0, 0, 0
+    for row in tabla_isr:
+        if base_gravable >= row["limite"]:
+            limite, cuota, porc = row["limite"], row["cuota"], row["porc"]
+        else: break
+    excedente = base_gravable - limite
+    marginal = excedente * porc
+    isr = marginal + cuota
+    return isr, {"Límite": limite, "Excedente": excedente, "Tasa (%)": porc, "Impuesto Marginal": marginal, "Cuota Fija": cuota, "ISR Determinado": isr}
+
+@medido()
+def calcular_imss_obrero(sbc, dias, anio=2026):
+    uma = valores_anio(anio)["UMA"]
+    exc = max(0, sbc - (3*uma))
+    conceptos = {
+        "Enfermedad (Exc)": exc * 0.004 * dias,
+        "Prest. Dinero": sbc * 0.0025 * dias,
+        "Gastos Médicos": sbc * 0.00375 * dias,
+        "Invalidez y Vida": sbc * 0.00625 * dias,
+        "Cesantía y Vejez": sbc * 0.01125 * dias
+    }
+    return sum(conceptos.values()), conceptos
+
+@medido()
+def calcular_imss_patronal(sbc, dias, prima_riesgo, anio=2026):
+    uma = valores_anio(anio)["UMA"]
+    exc = max(0, sbc - (3*uma))
+    veces_uma = sbc / uma
+    tabla_cyv, tasa_cyv = CYV_POR_ANIO[anio]
+    for tope, tasa in tabla_cyv:
+        if veces_uma <= tope:
+            tasa_cyv = tasa
+            break
+    conceptos = {
+        "Cuota Fija": (uma * 0.204) * dias,
+        "Excedente 3 UMA": exc * 0.011 * dias,
+        "Prest. Dinero": sbc * 0.007 * dias,
+        "Gastos Médicos": sbc * 0.0105 * dias,
+        "Riesgo Trabajo": sbc * (prima_riesgo/100) * dias,
+        "Invalidez y Vida": sbc * 0.0175 * dias,
+        "Guarderías": sbc * 0.01 * dias,
+        "Retiro (SAR)": sbc * 0.02 * dias,
+        "Cesantía y Vejez": sbc * tasa_cyv * dias,
+        "Infonavit": sbc * 0.05 * dias
+    }
+    return sum(conceptos.values()), conceptos
+
+@medido()
+def obtener_dias_vacaciones_ley(anios_antiguedad):
+    """Tabla de vacaciones dignas (vigente desde 2023)"""
+    anios = int(anios_antiguedad)
+    if anios < 1: return 12 # Proporcional de 12
+    if anios == 1: return 12
+    if anios == 2: return 14
+    if anios == 3: return 16
+    if anios == 4: return 18
+    if anios == 5: return 20
+    if 6 <= anios <= 10: return 22
+    if 11 <= anios <= 15: return 24
+    if 16 <= anios <= 20: return 26
+    if 21 <= anios <= 25: return 28
+    if 26 <= anios <= 30: return 30
+    return 32
+
+# --- TARIFAS DE ISR POR PERIODO ---
+
+class TarifaISR:
+    """Tarifa de ISR en arreglos contiguos (límite inferior, cuota fija, tasa) con búsqueda binaria."""
+
+    __slots__ = ("limites", "cuotas", "porcs")
+
+    def __init__(self, limites, cuotas, porcs):
+        self.limites = array("d", limites)
+        self.cuotas = array("d", cuotas)
+        self.porcs = array("d", porcs)
+
+    @classmethod
+    def desde_tabla(cls, tabla_isr, factor=1.0, decimales=None):
+        """Escala límites y cuotas de una tabla por `factor`; la tasa no cambia."""
+        escalar = (lambda x: x * factor) if decimales is None else (lambda x: round(x * factor, decimales))
+        return cls([escalar(row["limite"]) for row in tabla_isr],
+                   [escalar(row["cuota"]) for row in tabla_isr],
+                   [row["porc"] for row in tabla_isr])
+
+    def como_tabla(self):
+        return [{"limite": l, "cuota": c, "porc": p} for l, c, p in zip(self.limites, self.cuotas, self.porcs)]
+
+    def renglon(self, base_gravable):
+        i = bisect_right(self.limites, base_gravable) - 1
+        if i < 0: return 0, 0, 0
+        return self.limites[i], self.cuotas[i], self.porcs[i]
+
+    @medido()
+    def calcular(self, base_gravable):
+        """ISR determinado, sin armar el desglose."""
+        limite, cuota, porc = self.renglon(base_gravable)
+        return (base_gravable - limite) * porc + cuota
+
+    def desglose(self, base_gravable):
+        limite, cuota, porc = self.renglon(base_gravable)
+        excedente = base_gravable - limite
+        marginal = excedente * porc
+        isr = marginal + cuota
+        return isr, {"Límite": limite, "Excedente": excedente, "Tasa (%)": porc, "Impuesto Marginal": marginal, "Cuota Fija": cuota, "ISR Determinado": isr}
+
+def tarifa_del_periodo(tabla, periodo="Mensual", metodo=METODOS_ISR[0]):
+    """TarifaISR de `periodo` a partir de una tarifa mensual (lista de renglones).
+
+    Con "Proyección Mensual" el ISR se calcula sobre el sueldo proyectado al mes y se prorratea,
+    así que la tarifa es la mensual para cualquier periodo. Con la "Tarifa del Periodo (SAT)"
+    se usa la tarifa publicada para el periodo (mensual / 30.4 por días, a centavos).
+    """
+    if periodo == "Mensual" or metodo == METODOS_ISR[0]:
+        return TarifaISR.desde_tabla(tabla)
+    if metodo == METODOS_ISR[1]:
+        return TarifaISR.desde_tabla(tabla, PERIODOS_PAGO[periodo] / 30.4, decimales=2)
+    raise ValueError(f"Método de ISR desconocido: {metodo}")
+
+@lru_cache(maxsize=None)
+def tarifa_isr(periodo="Mensual", metodo=METODOS_ISR[0], anio=2026):
+    """Tarifa de ISR del registro para un periodo de pago, calculada una sola vez por combinación."""
+    if anio not in TARIFAS_ISR_MENSUAL:
+        raise ValueError(f"No hay tarifa de ISR para {anio}")
+    return tarifa_del_periodo(TARIFAS_ISR_MENSUAL[anio], periodo, metodo)
+
+@lru_cache(maxsize=None)
+def tarifa_isr_anual(anio=2026):
+    """Tarifa anual (art. 152 LISR): la mensual por 12, a centavos."""
+    if anio not in TARIFAS_ISR_MENSUAL:
+        raise ValueError(f"No hay tarifa de ISR para {anio}")
+    return TarifaISR.desde_tabla(TARIFAS_ISR_MENSUAL[anio], 12, decimales=2)
+
+def dias_mes_por_criterio(criterio):
+    return 30.0 if "Comercial" in criterio else 30.4
+
+def dias_del_periodo(periodo, dias_mes_base):
+    return PERIODOS_PAGO.get(periodo, dias_mes_base)
+
+@medido()
+def calcular_nomina_periodica(sueldo_diario, antig, prima_riesgo, tasa_isn, sm_aplicable, dias_pago, dias_mes_base,
+                              es_ajuste=False, ingreso_acumulado_prev=0.0, isr_retenido_prev=0.0,
+                              metodo_isr=METODOS_ISR[0], periodo=None, anio=2026):
+    """Cálculo completo del módulo Nómina Periódica para un empleado.
+
+    Con metodo_isr = "Tarifa del Periodo (SAT)" (requiere `periodo`) el ISR ordinario se
+    calcula directo sobre el ingreso del periodo con la tarifa de ese periodo. `anio` elige
+    UMA, tarifa y escalera de CyV del ejercicio; `sm_aplicable` debe ser el de ese año.
+    """
+    tarifa_mensual = tarifa_isr(anio=anio)
+    dias_vac = obtener_dias_vacaciones_ley(antig)
+    factor_int = 1 + ((15 + (dias_vac*0.25))/365)
+    sbc = min(sueldo_diario * factor_int, valores_anio(anio)["UMA"] * 25)
+    bruto_periodo = sueldo_diario * dias_pago
+    imss_obrero, conceptos_obr = calcular_imss_obrero(sbc, dias_pago, anio)
+
+    es_salario_minimo = False
+    desglose_isr_men = {}
+
+    if sueldo_diario <= (sm_aplicable + 1.0):
+        es_salario_minimo = True
+        isr_periodo = 0.0
+        base_mensual_proy = sueldo_diario * dias_mes_base
+        _, desglose_isr_men = calcular_isr_engine(base_mensual_proy, tarifa_mensual)
+    else:
+        if es_ajuste:
+            total_ingreso_mensual = ingreso_acumulado_prev + bruto_periodo
+            isr_total_mes, desglose_isr_men = calcular_isr_engine(total_ingreso_mensual, tarifa_mensual)
+            isr_periodo = isr_total_mes - isr_retenido_prev
+        elif metodo_isr == METODOS_ISR[1] and periodo is not None:
+            isr_periodo, desglose_isr_men = calcular_isr_engine(bruto_periodo, tarifa_isr(periodo, metodo=metodo_isr, anio=anio))
+        else:
+            base_mensual_proy = sueldo_diario * dias_mes_base
+            isr_mensual_proy, desglose_isr_men = calcular_isr_engine(base_mensual_proy, tarifa_mensual)
+            isr_periodo = isr_mensual_proy * (dias_pago / dias_mes_base)
+
+    neto = bruto_periodo - imss_obrero - isr_periodo
+    imss_patronal, conceptos_pat = calcular_imss_patronal(sbc, dias_pago, prima_riesgo, anio)
+    isn = bruto_periodo * (tasa_isn / 100)
+    costo_total = bruto_periodo + imss_patronal + isn
+    return {
+        "sbc": sbc, "bruto_periodo": bruto_periodo, "es_salario_minimo": es_salario_minimo,
+        "isr_periodo": isr_periodo, "desglose_isr": desglose_isr_men,
+        "imss_obrero": imss_obrero, "conceptos_obrero": conceptos_obr,
+        "imss_patronal": imss_patronal, "conceptos_patronal": conceptos_pat,
+        "isn": isn, "neto": neto, "costo_total": costo_total,
+    }
+
+@medido()
+def calcular_aguinaldo(sueldo_mensual, dias_ley, dias_trabajados, metodo=METODOS_AGUINALDO[0], anio=2026):
+    """Aguinaldo con exención de 30 UMA y retención por el método indicado (ver METODOS_AGUINALDO)."""
+    sd = sueldo_mensual / 30
+    aguinaldo_bruto = (dias_trabajados/365) * dias_ley * sd
+    exento = 30 * valores_anio(anio)["UMA"]
+    gravado = max(0, aguinaldo_bruto - exento)
+    tarifa_mensual = tarifa_isr(anio=anio)
+    isr_base = tarifa_mensual.calcular(sueldo_mensual)
+    if metodo == METODOS_AGUINALDO[1]:
+        mensualizado = gravado / 365 * 30.4
+        isr_total = tarifa_mensual.calcular(sueldo_mensual + mensualizado)
+        tasa = (isr_total - isr_base) / mensualizado if mensualizado > 0 else 0
+        isr_retener = gravado * tasa
+    else:
+        isr_total = tarifa_mensual.calcular(sueldo_mensual + gravado)
+        isr_retener = isr_total - isr_base
+    neto = aguinaldo_bruto - isr_retener
+    return {"aguinaldo_bruto": aguinaldo_bruto, "exento": exento, "gravado": gravado,
+            "isr_retener": isr_retener, "neto": neto}
+
+def aniversario(anio, f_alta):
+    """Aniversario de `f_alta` en `anio`; quien ingresó un 29 de febrero lo cumple el 28 en años no bisiestos."""
+    try:
+        return date(anio, f_alta.month, f_alta.day)
+    except ValueError:
+        return date(anio, 2, 28)
+
+@medido()
+def dias_finiquito(f_alta, f_baja):
+    """Antigüedad y días proporcionales de aguinaldo y vacaciones a la fecha de baja."""
+    antiguedad_dias_total = (f_baja - f_alta).days + 1
+    anios_completos = int(antiguedad_dias_total / 365.25)
+
+    # Aguinaldo Prop: Días del año en curso
+    inicio_anio_baja = date(f_baja.year, 1, 1)
+    fecha_inicio_ag = max(f_alta, inicio_anio_baja)
+    dias_ag_trab = (f_baja - fecha_inicio_ag).days + 1
+    prop_agui = (dias_ag_trab / 365) * 15 # Ley
+
+    # Vacaciones Prop: Días desde último aniversario
+    fecha_aniversario = aniversario(f_baja.year, f_alta)
+    if fecha_aniversario > f_baja:
+        fecha_aniversario = aniversario(f_baja.year - 1, f_alta)
+
+    dias_desde_aniversario = (f_baja - fecha_aniversario).days + 1
+    dias_ley_tocan = obtener_dias_vacaciones_ley(anios_completos + 1) # Del año que corre
+    prop_vac = (dias_desde_aniversario / 365) * dias_ley_tocan
+    return {"antiguedad_dias_total": antiguedad_dias_total, "anios_completos": anios_completos,
+            "prop_agui": prop_agui, "prop_vac": prop_vac, "dias_ley_tocan": dias_ley_tocan}
+
+@medido()
+def calcular_finiquito(causa, sueldo_men, sm_aplicable, dias, dias_vac_no_gozadas=0.0, anio=2026):
+    """Finiquito (y liquidación si el despido es injustificado) a partir de `dias_finiquito`."""
+    uma = valores_anio(anio)["UMA"]
+    antiguedad_dias_total, anios_completos = dias["antiguedad_dias_total"], dias["anios_completos"]
+    total_dias_vac = dias["prop_vac"] + dias_vac_no_gozadas
+
+    sd = sueldo_men / 30
+    factor_int = 1 + ((15 + (dias["dias_ley_tocan"]*0.25))/365)
+    sdi = sd * factor_int
+
+    monto_aguinaldo = dias["prop_agui"] * sd
+    monto_vac = total_dias_vac * sd
+    monto_prima_vac = monto_vac * 0.25
+
+    tope_prima = 2 * sm_aplicable
+    base_prima = min(sd, tope_prima)
+    prima_antiguedad = 0
+    if causa == "Despido Injustificado" or anios_completos >= 15:
+        prima_antiguedad = (antiguedad_dias_total / 365) * 12 * base_prima
+
+    indemnizacion = 0
+    veinte_dias = 0
+    if causa == "Despido Injustificado":
+        indemnizacion = 3 * 30 * sdi
+        veinte_dias = 20 * (antiguedad_dias_total / 365) * sdi
+
+    # IMPUESTOS
+    isr_ord_men, desglose_isr_men = calcular_isr_engine(sueldo_men, tarifa_isr(anio=anio))
+    tasa_marginal = desglose_isr_men["Tasa (%)"]
+
+    ex_agui = min(monto_aguinaldo, 30*uma)
+    ex_pv = min(monto_prima_vac, 15*uma)
+    tope_90_umas = 90 * uma * anios_completos
+    total_separacion = prima_antiguedad + indemnizacion + veinte_dias
+    ex_separacion = min(total_separacion, tope_90_umas)
+
+    # ISR Finiquito (Simplificado)
+    isr_finiquito = ((monto_aguinaldo - ex_agui) + (monto_prima_vac - ex_pv) + monto_vac) * tasa_marginal
+
+    # ISR Liquidación (Tasa Efectiva)
+    gravado_sep = total_separacion - ex_separacion
+    tasa_efectiva = isr_ord_men / sueldo_men if sueldo_men > 0 else 0
+    isr_separacion = gravado_sep * tasa_efectiva
+
+    total_pagar = total_separacion + monto_aguinaldo + monto_vac + monto_prima_vac
+    total_isr = isr_finiquito + isr_separacion
+    total_neto = total_pagar - total_isr
+
+    detalle = [
+        {"Concepto": "Aguinaldo Proporcional", "Bruto": monto_aguinaldo, "Exento": ex_agui, "ISR Aprox": (monto_aguinaldo-ex_agui)*tasa_marginal},
+        {"Concepto": "Vacaciones (Prop + Pend)", "Bruto": monto_vac, "Exento": 0, "ISR Aprox": monto_vac*tasa_marginal},
+        {"Concepto": "Prima Vacacional", "Bruto": monto_prima_vac, "Exento": ex_pv, "ISR Aprox": (monto_prima_vac-ex_pv)*tasa_marginal},
+    ]
+    if total_separacion > 0:
+        detalle.append({"Concepto": "Pagos por Separación (Liq + Antig)", "Bruto": total_separacion, "Exento": ex_separacion, "ISR Aprox": isr_separacion})
+    for row in detalle:
+        row["Neto"] = row["Bruto"] - row["ISR Aprox"]
+    return {"total_pagar": total_pagar, "total_isr": total_isr, "total_neto": total_neto, "detalle": detalle}
+
+@medido()
+def calcular_ajuste_anual(ingresos_gravados, isr_retenido, anio=2026):
+    """Cálculo anual de un empleado a partir de los periodos pagados en el año.
+
+    Saldo positivo: ISR a cargo del trabajador (se retiene); negativo: saldo a favor.
+    """
+    ingreso_anual = sum(ingresos_gravados)
+    retenido = sum(isr_retenido)
+    isr_anual, desglose = calcular_isr_engine(ingreso_anual, tarifa_isr_anual(anio))
+    saldo = isr_anual - retenido
+    return {"ingreso_anual": ingreso_anual, "isr_anual": isr_anual, "isr_retenido": retenido, "saldo": saldo,
+            "aplica": ingreso_anual <= LIMITE_AJUSTE_ANUAL, "desglose_isr": desglose}
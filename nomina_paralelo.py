@@ -0,0 +1,104 @@
+"""Ejecución de nómina en varios procesos.
+
+El trabajo se divide de forma determinista (por registro patronal / periodo, o por rangos
+contiguos de empleados), cada parte se calcula con calcular_nomina_lote en un proceso del
+pool y los resultados se reúnen en el orden original de los renglones. Como cada renglón
+se calcula de forma independiente, el resultado es idéntico al de una corrida en serie.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from nomina_motor import dias_del_periodo, dias_mes_por_criterio
+from nomina_lote import calcular_nomina_lote
+
+COLUMNA_EMPRESA = "registro_patronal"
+COLUMNA_PERIODO = "periodo"
+
+
+def iterar_en_orden(ejecutor, funcion, tareas, en_vuelo):
+    """Como `ejecutor.map`, pero con a lo más `en_vuelo` tareas pendientes a la vez.
+
+    Los resultados salen en el orden de `tareas`, que se consume de forma perezosa; así un
+    generador de bloques no se lee completo a memoria antes de empezar a escribir.
+    """
+    pendientes = deque()
+    for tarea in tareas:
+        pendientes.append(ejecutor.submit(funcion, tarea))
+        if len(pendientes) >= en_vuelo:
+            yield pendientes.popleft().result()
+    while pendientes:
+        yield pendientes.popleft().result()
+
+
+# --- DIVISIÓN DEL TRABAJO ---
+
+def dividir_por_claves(datos, claves=(COLUMNA_EMPRESA,)):
+    """Una parte por combinación de `claves`, en orden ascendente de las claves."""
+    claves = [c for c in claves if c in datos]
+    if not claves:
+        return [datos]
+    return [grupo for _, grupo in datos.groupby(claves, sort=True, dropna=False)]
+
+def dividir_por_rangos(datos, partes):
+    """`partes` rangos contiguos de renglones de tamaño casi igual."""
+    partes = max(1, min(partes, len(datos)))
+    tamano, sobrante = divmod(len(datos), partes)
+    cortes, inicio = [], 0
+    for i in range(partes):
+        fin = inicio + tamano + (1 if i < sobrante else 0)
+        cortes.append(datos.iloc[inicio:fin])
+        inicio = fin
+    return cortes
+
+
+# --- EJECUCIÓN ---
+
+def _calcular_parte(tarea):
+    parte, parametros = tarea
+    if COLUMNA_PERIODO not in parte:
+        return calcular_nomina_lote(parte, **parametros)
+    # La frecuencia de pago de cada renglón sustituye a la global
+    dias_mes_base = parametros.get("dias_mes_base", 30.0)
+    resultados = []
+    for periodo, grupo in parte.groupby(COLUMNA_PERIODO, sort=False):
+        por_periodo = dict(parametros, periodo=periodo, dias_pago=dias_del_periodo(periodo, dias_mes_base))
+        resultados.append(calcular_nomina_lote(grupo, **por_periodo))
+    return pd.concat(resultados)
+
+def ejecutar_nomina_paralela(datos, procesos=None, dividir_por="empresa", empresas=None, criterio=None,
+                             **parametros):
+    """Calcula la nómina de `datos` en un pool de `procesos` y regresa el DataFrame de resultados.
+
+    dividir_por:
+      "empresa": una tarea por registro patronal y periodo.
+      "rango":   rangos contiguos de empleados, cuatro por proceso para balancear la carga.
+    `empresas` (opcional) es un DataFrame indexado por registro patronal con prima_riesgo y
+    tasa_isn; sus columnas se asignan a cada empleado de esa empresa. Los demás argumentos
+    se pasan tal cual a calcular_nomina_lote. Si existe la columna `periodo`, la frecuencia de
+    pago de cada renglón (Quincenal, Semanal, ...) define sus días pagados.
+    """
+    procesos = procesos or os.cpu_count() or 1
+    if criterio is not None:
+        parametros["dias_mes_base"] = dias_mes_por_criterio(criterio)
+    indice_original = datos.index
+    datos = datos.reset_index(drop=True)
+    if empresas is not None:
+        datos = datos.drop(columns=[c for c in empresas.columns if c in datos]).join(empresas, on=COLUMNA_EMPRESA)
+
+    if dividir_por == "empresa": partes = dividir_por_claves(datos, (COLUMNA_EMPRESA, COLUMNA_PERIODO))
+    elif dividir_por == "rango": partes = dividir_por_rangos(datos, procesos * 4)
+    else: raise ValueError(f"dividir_por debe ser 'empresa' o 'rango', no {dividir_por!r}")
+
+    tareas = [(parte, parametros) for parte in partes]
+    if procesos == 1 or len(tareas) == 1:
+        resultados = [_calcular_parte(t) for t in tareas]
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            resultados = list(iterar_en_orden(ejecutor, _calcular_parte, tareas, 2 * procesos))
+    # Orden estable: el de los renglones de entrada, sin importar cómo se dividió el trabajo
+    resultado = pd.concat(resultados).sort_index()
+    resultado.index = indice_original
+    return resultado
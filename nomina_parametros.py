@@ -0,0 +1,116 @@
+"""Parámetros por ejercicio compilados a arreglos de NumPy, para recalcular varios años.
+
+Cada año del registro de nomina_motor (UMA, salarios mínimos, tarifas de ISR mensual, anual
+y del SAT por periodo, escalera de CyV y tabla de vacaciones) se compila una sola vez en un
+renglón de un arreglo estructurado de sólo lectura. El arreglo se puede guardar en un .npy y abrirse con mmap,
+de modo que un proceso por lotes no reconstruye nada al arrancar.
+
+ParametrosLote selecciona el año de cada renglón con un índice: con un solo año los
+motores usan búsqueda binaria sobre la tarifa; con años mezclados, comparan la base contra
+la matriz de límites de cada renglón (n x renglones de la tarifa).
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from nomina_motor import (CYV_POR_ANIO, METODOS_ISR, PERIODOS_PAGO, TARIFAS_ISR_MENSUAL, VALORES_POR_ANIO,
+                          obtener_dias_vacaciones_ley, tarifa_isr, tarifa_isr_anual)
+
+ANIOS = tuple(sorted(VALORES_POR_ANIO))
+RENGLONES_ISR = 11
+TOPES_CYV = 7
+ANIOS_VACACIONES = 32  # del índice 31 en adelante aplica el último renglón
+PERIODOS = tuple(PERIODOS_PAGO)  # tarifas del SAT por periodo, en este orden
+
+DTYPE_PARAMETROS = np.dtype([
+    ("anio", "i4"), ("uma", "f8"), ("sm_general", "f8"), ("sm_zlfn", "f8"),
+    ("isr_limites", "f8", (RENGLONES_ISR,)), ("isr_cuotas", "f8", (RENGLONES_ISR,)), ("isr_porcs", "f8", (RENGLONES_ISR,)),
+    ("isr_anual_limites", "f8", (RENGLONES_ISR,)), ("isr_anual_cuotas", "f8", (RENGLONES_ISR,)),
+    ("isr_periodo_limites", "f8", (len(PERIODOS), RENGLONES_ISR)), ("isr_periodo_cuotas", "f8", (len(PERIODOS), RENGLONES_ISR)),
+    ("cyv_topes", "f8", (TOPES_CYV,)), ("cyv_tasas", "f8", (TOPES_CYV + 1,)),
+    ("vacaciones", "f8", (ANIOS_VACACIONES,)),
+])
+
+
+def compilar(anios=ANIOS):
+    """Arreglo estructurado (un renglón por año, ordenado) con los parámetros de `anios`."""
+    tabla = np.zeros(len(anios), dtype=DTYPE_PARAMETROS)
+    vacaciones = [obtener_dias_vacaciones_ley(a) for a in range(ANIOS_VACACIONES)]
+    for i, anio in enumerate(sorted(anios)):
+        valores, tarifa = VALORES_POR_ANIO[anio], TARIFAS_ISR_MENSUAL[anio]
+        escalera, tasa_maxima = CYV_POR_ANIO[anio]
+        if len(tarifa) != RENGLONES_ISR or len(escalera) != TOPES_CYV:
+            raise ValueError(f"Los parámetros de {anio} no tienen la forma esperada")
+        anual = tarifa_isr_anual(anio)
+        por_periodo = [tarifa_isr(periodo, metodo=METODOS_ISR[1], anio=anio) for periodo in PERIODOS]
+        tabla[i] = (anio, valores["UMA"], valores["SALARIO_MINIMO_GENERAL"], valores["SALARIO_MINIMO_ZLFN"],
+                    [r["limite"] for r in tarifa], [r["cuota"] for r in tarifa], [r["porc"] for r in tarifa],
+                    anual.limites, anual.cuotas, [t.limites for t in por_periodo], [t.cuotas for t in por_periodo],
+                    [tope for tope, _ in escalera], [tasa for _, tasa in escalera] + [tasa_maxima], vacaciones)
+    tabla.flags.writeable = False
+    return tabla
+
+@lru_cache(maxsize=1)
+def parametros_compilados():
+    """Registro completo, compilado una vez por proceso."""
+    return compilar()
+
+def guardar_parametros(ruta, tabla=None):
+    np.save(ruta, parametros_compilados() if tabla is None else tabla, allow_pickle=False)
+
+def cargar_parametros(ruta):
+    """Abre un .npy de parámetros con mmap (sólo lectura)."""
+    tabla = np.load(ruta, mmap_mode="r", allow_pickle=False)
+    if tabla.dtype != DTYPE_PARAMETROS:
+        raise ValueError(f"{ruta} no es un archivo de parámetros de nómina de esta versión "
+                         "(vuelve a generarlo con 'nomina_cli.py parametros')")
+    return tabla
+
+
+class ParametrosLote:
+    """Parámetros de cada renglón de un lote: la tabla compilada y el índice del año de cada renglón."""
+
+    __slots__ = ("tabla", "indice")
+
+    def __init__(self, tabla, indice):
+        self.tabla = tabla
+        self.indice = indice
+
+    @property
+    def por_renglon(self):
+        return np.ndim(self.indice) > 0
+
+    def campo(self, nombre):
+        """Valor del campo por renglón (o único, si todo el lote es del mismo año)."""
+        return self.tabla[nombre][self.indice]
+
+    def tarifa_isr(self):
+        return self.campo("isr_limites"), self.campo("isr_cuotas"), self.campo("isr_porcs")
+
+    def tarifa_isr_anual(self):
+        return self.campo("isr_anual_limites"), self.campo("isr_anual_cuotas"), self.campo("isr_porcs")
+
+    def tarifa_isr_periodo(self, periodo, metodo_isr):
+        """Tarifa que grava el ingreso del periodo: la del SAT compilada, o la mensual con
+        "Proyección Mensual" (se proyecta al mes y se prorratea) y en el periodo "Mensual"."""
+        if periodo == "Mensual" or metodo_isr == METODOS_ISR[0]: return self.tarifa_isr()
+        if metodo_isr != METODOS_ISR[1]: raise ValueError(f"Método de ISR desconocido: {metodo_isr}")
+        j = PERIODOS.index(periodo)
+        return (self.tabla["isr_periodo_limites"][self.indice, j], self.tabla["isr_periodo_cuotas"][self.indice, j],
+                self.campo("isr_porcs"))
+
+def parametros_lote(anio=2026, tabla=None):
+    """ParametrosLote para un año o un arreglo de años (uno por renglón)."""
+    if tabla is None:
+        if np.ndim(anio) == 0: return _parametros_de_un_anio(int(anio))
+        tabla = parametros_compilados()
+    anios = np.asarray(anio)
+    indice = np.searchsorted(tabla["anio"], anios)
+    fuera = (indice >= len(tabla)) | (tabla["anio"][np.minimum(indice, len(tabla) - 1)] != anios)
+    if np.any(fuera):
+        raise ValueError(f"No hay parámetros para {np.unique(anios[fuera]).tolist()}")
+    return ParametrosLote(tabla, int(indice) if anios.ndim == 0 else indice)
+
+@lru_cache(maxsize=None)
+def _parametros_de_un_anio(anio):
+    return parametros_lote(anio, parametros_compilados())
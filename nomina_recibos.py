@@ -0,0 +1,214 @@
+"""Recibos de nómina por empleado, generados en flujo hacia un ZIP.
+
+Cada renglón de resultados (calcular_nomina_lote con desglose_isr=True, más las columnas
+de identificación del empleado) se convierte en un XML al estilo del CFDI de nómina 1.2 y,
+opcionalmente, en un HTML imprimible con los mismos conceptos que muestra la interfaz: la
+auditoría del ISR, la tabla de IMSS obrero y el neto. El XML no lleva sello ni timbre; la
+auditoría y el detalle de IMSS van en la Addenda.
+
+Todo es perezoso: `generar_recibos` produce un documento a la vez y `escribir_zip` lo
+comprime en cuanto llega, así que la memoria depende del bloque, no del número de recibos.
+Columnas opcionales de la entrada: empleado, nombre, rfc, curp y nss.
+"""
+import html
+import re
+import sys
+import zipfile
+from datetime import date, timedelta
+from functools import lru_cache
+from math import ceil
+from xml.sax.saxutils import quoteattr
+
+from nomina_lote import COLUMNA_EMPLEADO
+from nomina_metricas import medido
+from nomina_motor import METODOS_ISR
+
+FORMATOS = ("xml", "html")
+RFC_GENERICO = "XAXX010101000"
+PERIODICIDAD_SAT = {"Semanal": "02", "Quincenal": "04", "Mensual": "05", "Decenal": "10"}
+_COLUMNAS_ISR = ("ISR: Base", "ISR: Límite", "ISR: Excedente", "ISR: Tasa (%)", "ISR: Impuesto Marginal",
+                 "ISR: Cuota Fija", "ISR: ISR Determinado")
+
+
+def encabezado_recibo(periodo="Quincenal", dias_pago=15, dias_mes_base=30.0, metodo_isr=METODOS_ISR[0],
+                      fecha_pago=None, emisor_rfc=RFC_GENERICO, emisor_nombre="", regimen_fiscal="601",
+                      lugar_expedicion="00000"):
+    """Datos comunes a todos los recibos de una corrida (dict serializable para los procesos)."""
+    fecha_pago = fecha_pago or date.today()
+    return {"periodo": periodo, "dias_pago": dias_pago, "dias_mes_base": dias_mes_base, "metodo_isr": metodo_isr,
+            "fecha_pago": fecha_pago.isoformat(),
+            "fecha_inicial": (fecha_pago - timedelta(days=ceil(dias_pago) - 1)).isoformat(),
+            "emisor_rfc": emisor_rfc, "emisor_nombre": emisor_nombre, "regimen_fiscal": regimen_fiscal,
+            "lugar_expedicion": lugar_expedicion}
+
+
+# --- CONTENIDO DEL RECIBO ---
+
+# Las etiquetas (pasos, conceptos, tasas) se repiten en cada recibo: se escapan una vez
+_attr = lru_cache(maxsize=4096)(quoteattr)
+_esc = lru_cache(maxsize=4096)(html.escape)
+
+def _m(monto):
+    texto = f"{monto:.2f}"
+    return "0.00" if texto == "-0.00" else texto
+
+def _texto(r, columna):
+    valor = r.get(columna)
+    return "" if valor is None or valor != valor else str(valor)  # columna ausente o NaN
+
+def pasos_isr(r, enc):
+    """Auditoría del ISR en los mismos pasos que la pestaña "Desglose ISR" de la interfaz."""
+    if r["Salario Mínimo"]: return []
+    tasa = r["ISR: Tasa (%)"] * 100
+    pasos = [["1. Base Mensual", r["ISR: Base"]], ["2. (-) Límite Inferior", r["ISR: Límite"]],
+             ["3. (=) Excedente", r["ISR: Excedente"]], [f"4. (x) Tasa ({tasa:.2f}%)", r["ISR: Impuesto Marginal"]],
+             ["5. (+) Cuota Fija", r["ISR: Cuota Fija"]], ["6. (=) ISR Mensual", r["ISR: ISR Determinado"]]]
+    if enc["metodo_isr"] == METODOS_ISR[1] and not r["Ajuste"]:
+        pasos[0][0], pasos[-1][0] = f"1. Base {enc['periodo']}", f"6. (=) ISR {enc['periodo']}"
+    elif not r["Ajuste"]:
+        pasos.append([f"7. (x) Factor Días ({enc['dias_pago']}/{enc['dias_mes_base']})", r["ISR"]])
+    return pasos
+
+def _importes(r):
+    """Importes redondeados del comprobante; el total sale de ellos para que cuadre al centavo."""
+    bruto, imss, isr = round(r["Bruto"], 2), round(r["IMSS Obrero"], 2), round(r["ISR"], 2)
+    retenido, reintegro = max(isr, 0.0), max(-isr, 0.0)
+    return bruto, imss, retenido, reintegro, bruto + reintegro - imss - retenido
+
+
+# --- FORMATOS ---
+
+def recibo_xml(r, enc):
+    bruto, imss, retenido, reintegro, total = _importes(r)
+    a = _attr
+    deducciones = f'<nomina12:Deduccion TipoDeduccion="001" Clave="001" Concepto="Seguridad social" Importe="{_m(imss)}"/>'
+    if retenido: deducciones += f'<nomina12:Deduccion TipoDeduccion="002" Clave="002" Concepto="ISR" Importe="{_m(retenido)}"/>'
+    otros_pagos, total_otros, total_retenido = "", "", ""
+    if retenido: total_retenido = f' TotalImpuestosRetenidos="{_m(retenido)}"'
+    if reintegro:
+        total_otros = f' TotalOtrosPagos="{_m(reintegro)}"'
+        otros_pagos = (f'<nomina12:OtrosPagos><nomina12:OtroPago TipoOtroPago="001" Clave="001" '
+                       f'Concepto="Reintegro de ISR pagado en exceso" Importe="{_m(reintegro)}"/></nomina12:OtrosPagos>')
+    receptor_nomina = f' Curp={a(_texto(r, "curp"))}' if _texto(r, "curp") else ""
+    if _texto(r, "nss"): receptor_nomina += f' NumSeguridadSocial={a(_texto(r, "nss"))}'
+    auditoria = "".join(f'<nominapp:Paso Concepto={a(paso)} Importe="{_m(monto)}"/>' for paso, monto in pasos_isr(r, enc))
+    imss_detalle = "".join(f'<nominapp:Cuota Concepto={a(k)} Importe="{_m(v)}"/>' for k, v in r["_obrero"])
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<cfdi:Comprobante xmlns:cfdi="http://www.sat.gob.mx/cfd/4" xmlns:nomina12="http://www.sat.gob.mx/nomina12" '
+        'xmlns:nominapp="urn:nominapp:recibo" Version="4.0" TipoDeComprobante="N" Moneda="MXN" Exportacion="01" '
+        f'Fecha="{enc["fecha_pago"]}T00:00:00" LugarExpedicion={a(enc["lugar_expedicion"])} '
+        f'SubTotal="{_m(bruto + reintegro)}" Descuento="{_m(imss + retenido)}" Total="{_m(total)}">'
+        f'<cfdi:Emisor Rfc={a(enc["emisor_rfc"])} Nombre={a(enc["emisor_nombre"])} RegimenFiscal={a(enc["regimen_fiscal"])}/>'
+        f'<cfdi:Receptor Rfc={a(_texto(r, "rfc") or RFC_GENERICO)} Nombre={a(_texto(r, "nombre"))} UsoCFDI="CN01"/>'
+        '<cfdi:Complemento>'
+        f'<nomina12:Nomina Version="1.2" TipoNomina="O" FechaPago="{enc["fecha_pago"]}" '
+        f'FechaInicialPago="{enc["fecha_inicial"]}" FechaFinalPago="{enc["fecha_pago"]}" '
+        f'NumDiasPagados="{enc["dias_pago"]:.3f}" TotalPercepciones="{_m(bruto)}" TotalDeducciones="{_m(imss + retenido)}"'
+        f'{total_otros}>'
+        f'<nomina12:Receptor NumEmpleado={a(str(r["_empleado"]))}{receptor_nomina} '
+        f'PeriodicidadPago="{PERIODICIDAD_SAT.get(enc["periodo"], "99")}" SalarioDiarioIntegrado="{_m(r["SBC"])}"/>'
+        f'<nomina12:Percepciones TotalSueldos="{_m(bruto)}" TotalGravado="{_m(bruto)}" TotalExento="0.00">'
+        f'<nomina12:Percepcion TipoPercepcion="001" Clave="001" Concepto="Sueldos, Salarios Rayas y Jornales" '
+        f'ImporteGravado="{_m(bruto)}" ImporteExento="0.00"/></nomina12:Percepciones>'
+        f'<nomina12:Deducciones TotalOtrasDeducciones="{_m(imss)}"'
+        f'{total_retenido}>{deducciones}</nomina12:Deducciones>'
+        f'{otros_pagos}</nomina12:Nomina></cfdi:Complemento>'
+        f'<cfdi:Addenda><nominapp:Detalle Neto="{_m(total)}" SalarioMinimo="{"true" if r["Salario Mínimo"] else "false"}">'
+        f'<nominapp:AuditoriaISR>{auditoria}</nominapp:AuditoriaISR>'
+        f'<nominapp:IMSSObrero Total="{_m(imss)}">{imss_detalle}</nominapp:IMSSObrero>'
+        '</nominapp:Detalle></cfdi:Addenda></cfdi:Comprobante>\n'
+    )
+
+_ESTILO_HTML = ("body{font-family:sans-serif;max-width:640px;margin:24px auto;color:#0f172a}"
+                "table{width:100%;border-collapse:collapse;margin-bottom:16px}td{padding:4px 8px;border-bottom:1px solid #e2e8f0}"
+                "td:last-child{text-align:right}h1{font-size:1.3em}h2{font-size:1em;margin-top:20px}.neto{font-weight:700}")
+
+def _tabla_html(filas):
+    return "<table>" + "".join(f"<tr><td>{_esc(c)}</td><td>${monto:,.2f}</td></tr>" for c, monto in filas) + "</table>"
+
+def recibo_html(r, enc):
+    bruto, imss, retenido, reintegro, total = _importes(r)
+    nombre = html.escape(_texto(r, "nombre"))
+    resumen = [("Ingreso Bruto", bruto), ("(-) IMSS Obrero", imss), ("(-) ISR Retenido", retenido)]
+    if reintegro: resumen.append(("(+) Reintegro de ISR", reintegro))
+    pasos = pasos_isr(r, enc)
+    auditoria = _tabla_html(pasos) if pasos else "<p>No aplica desglose por Salario Mínimo.</p>"
+    return (
+        f'<!DOCTYPE html><html lang="es"><head><meta charset="utf-8"><title>Recibo {html.escape(str(r["_empleado"]))}</title>'
+        f'<style>{_ESTILO_HTML}</style></head><body>'
+        f'<h1>Recibo de Nómina: {html.escape(enc["periodo"])}</h1>'
+        f'<p>{html.escape(enc["emisor_nombre"])} ({html.escape(enc["emisor_rfc"])})<br>'
+        f'Empleado {html.escape(str(r["_empleado"]))} {nombre}<br>'
+        f'Periodo {enc["fecha_inicial"]} a {enc["fecha_pago"]} ({enc["dias_pago"]} días)</p>'
+        f'{_tabla_html(resumen)}<p class="neto">Neto a Recibir: ${total:,.2f}</p>'
+        f'<h2>Auditoría de Cálculo ISR</h2>{auditoria}'
+        f'<h2>IMSS Obrero</h2>{_tabla_html(r["_obrero"])}'
+        '</body></html>\n'
+    )
+
+_RENDER = {"xml": recibo_xml, "html": recibo_html}
+
+
+# --- GENERACIÓN Y ZIP ---
+
+def _renglones(resultados):
+    """Un dict por renglón con valores de Python (sin pasar por iterrows)."""
+    faltan = [c for c in _COLUMNAS_ISR if c not in resultados]
+    if faltan:
+        raise ValueError(f"Faltan {faltan}: calcula la nómina con desglose_isr=True")
+    nombres = [*resultados.columns, "_empleado", "_obrero"]
+    empleados = resultados[COLUMNA_EMPLEADO] if COLUMNA_EMPLEADO in resultados else resultados.index
+    obrero = [c for c in resultados.columns if c.startswith("Obrero: ")]
+    etiquetas = [c.removeprefix("Obrero: ") for c in obrero]
+    # Conceptos de IMSS obrero ya emparejados con su etiqueta: (concepto, monto) por renglón
+    conceptos = (list(zip(etiquetas, montos)) for montos in zip(*(resultados[c].tolist() for c in obrero)))
+    columnas = [resultados[c].tolist() for c in resultados.columns] + [list(empleados), conceptos]
+    for valores in zip(*columnas):
+        yield dict(zip(nombres, valores))
+
+def _nombre_archivo(empleado):
+    return re.sub(r"[^\w.-]", "_", str(empleado))
+
+def generar_recibos(resultados, encabezado, formatos=("xml",)):
+    """Genera (nombre, contenido en bytes) por renglón y formato; el empleado debe ser único."""
+    for r in _renglones(resultados):
+        base = _nombre_archivo(r["_empleado"])
+        for formato in formatos:
+            yield f"{formato}/{base}.{formato}", _RENDER[formato](r, encabezado).encode("utf-8")
+
+@medido()
+def recibos_de_bloque(resultados, encabezado, formatos=("xml",)):
+    """Documentos de un bloque ya renderizados (para calcularlos en otro proceso)."""
+    return list(generar_recibos(resultados, encabezado, formatos))
+
+def escribir_zip(destino, documentos):
+    """Comprime `documentos` (iterable de (nombre, bytes)) en `destino` conforme llegan; regresa cuántos."""
+    with EscritorZip(destino) as escritor:
+        for documento in documentos:
+            escritor.escribir((documento,))
+    return escritor.renglones
+
+class EscritorZip:
+    """Escribe documentos en un ZIP de forma incremental; '-' es la salida estándar (sin seek)."""
+
+    def __init__(self, ruta, documentos_por_recibo=1):
+        self.renglones = 0
+        self._documentos = 0
+        self._por_recibo = documentos_por_recibo
+        self._zip = zipfile.ZipFile(sys.stdout.buffer if ruta == "-" else ruta, "w", zipfile.ZIP_DEFLATED)
+
+    def escribir(self, documentos):
+        for nombre, contenido in documentos:
+            self._zip.writestr(nombre, contenido)
+            self._documentos += 1
+        self.renglones = self._documentos // self._por_recibo
+
+    def cerrar(self):
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
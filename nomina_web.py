@@ -1,9 +1,18 @@
 import streamlit as st
 import pandas as pd
-import altair as alt
+import io
 import os
+from collections import OrderedDict
 from datetime import date, timedelta
 
+from nomina_motor import (
+    VALORES_POR_ANIO, valores_anio, calcular_nomina_periodica, calcular_aguinaldo, calcular_finiquito, dias_finiquito,
+    dias_del_periodo, dias_mes_por_criterio, METODOS_ISR, METODOS_AGUINALDO,
+)
+from nomina_metricas import REGISTRO, iniciar_rerun, terminar_rerun, medido, tramo
+
+iniciar_rerun()
+
 # --- CONFIGURACIÓN ---
 st.set_page_config(
     page_title="Nominapp MX | Enterprise",
@@ -12,27 +21,6 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# --- DATOS OFICIALES 2026 ---
-VALORES_2026 = {
-    "UMA": 117.31,
-    "SALARIO_MINIMO_GENERAL": 315.04,
-    "SALARIO_MINIMO_ZLFN": 440.87,
-}
-
-TABLA_ISR_MENSUAL = [
-    {"limite": 0.01, "cuota": 0.00, "porc": 0.0192},
-    {"limite": 844.60, "cuota": 16.22, "porc": 0.0640},
-    {"limite": 7168.52, "cuota": 420.95, "porc": 0.1088},
-    {"limite": 12598.03, "cuota": 1011.68, "porc": 0.1600},
-    {"limite": 14644.65, "cuota": 1339.14, "porc": 0.1792},
-    {"limite": 17533.65, "cuota": 1856.84, "porc": 0.2136},
-    {"limite": 35362.84, "cuota": 5665.16, "porc": 0.2352},
-    {"limite": 55736.69, "cuota": 10457.09, "porc": 0.3000},
-    {"limite": 106410.51, "cuota": 25659.23, "porc": 0.3200},
-    {"limite": 141880.67, "cuota": 37009.69, "porc": 0.3400},
-    {"limite": 425642.00, "cuota": 133488.54, "porc": 0.3500},
-]
-
 # --- CSS DARK ENTERPRISE ---
 st.markdown("""
 <style>
@@ -50,72 +38,136 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# --- MOTORES DE CÁLCULO ---
-
-def calcular_isr_engine(base_gravable, tabla_isr):
-    limite, cuota, porc = 0, 0, 0
-    for row in tabla_isr:
-        if base_gravable >= row["limite"]:
-            limite, cuota, porc = row["limite"], row["cuota"], row["porc"]
-        else: break
-    excedente = base_gravable - limite
-    marginal = excedente * porc
-    isr = marginal + cuota
-    return isr, {"Límite": limite, "Excedente": excedente, "Tasa (%)": porc, "Impuesto Marginal": marginal, "Cuota Fija": cuota, "ISR Determinado": isr}
-
-def calcular_imss_obrero(sbc, dias):
-    uma = VALORES_2026["UMA"]
-    exc = max(0, sbc - (3*uma))
-    conceptos = {
-        "Enfermedad (Exc)": exc * 0.004 * dias,
-        "Prest. Dinero": sbc * 0.0025 * dias,
-        "Gastos Médicos": sbc * 0.00375 * dias,
-        "Invalidez y Vida": sbc * 0.00625 * dias,
-        "Cesantía y Vejez": sbc * 0.01125 * dias
-    }
-    return sum(conceptos.values()), conceptos
-
-def calcular_imss_patronal(sbc, dias, prima_riesgo):
-    uma = VALORES_2026["UMA"]
-    exc = max(0, sbc - (3*uma))
-    veces_uma = sbc / uma
-    if veces_uma <= 1.0: tasa_cyv = 0.0315
-    elif veces_uma <= 1.5: tasa_cyv = 0.0420
-    elif veces_uma <= 2.0: tasa_cyv = 0.0655
-    elif veces_uma <= 2.5: tasa_cyv = 0.0796
-    elif veces_uma <= 3.0: tasa_cyv = 0.0937
-    elif veces_uma <= 3.5: tasa_cyv = 0.1077
-    elif veces_uma <= 4.0: tasa_cyv = 0.11875
-    else: tasa_cyv = 0.11875
-    conceptos = {
-        "Cuota Fija": (uma * 0.204) * dias,
-        "Excedente 3 UMA": exc * 0.011 * dias,
-        "Prest. Dinero": sbc * 0.007 * dias,
-        "Gastos Médicos": sbc * 0.0105 * dias,
-        "Riesgo Trabajo": sbc * (prima_riesgo/100) * dias,
-        "Invalidez y Vida": sbc * 0.0175 * dias,
-        "Guarderías": sbc * 0.01 * dias,
-        "Retiro (SAR)": sbc * 0.02 * dias,
-        "Cesantía y Vejez": sbc * tasa_cyv * dias,
-        "Infonavit": sbc * 0.05 * dias
-    }
-    return sum(conceptos.values()), conceptos
-
-def obtener_dias_vacaciones_ley(anios_antiguedad):
-    """Tabla de vacaciones dignas 2026"""
-    anios = int(anios_antiguedad)
-    if anios < 1: return 12 # Proporcional de 12
-    if anios == 1: return 12
-    if anios == 2: return 14
-    if anios == 3: return 16
-    if anios == 4: return 18
-    if anios == 5: return 20
-    if 6 <= anios <= 10: return 22
-    if 11 <= anios <= 15: return 24
-    if 16 <= anios <= 20: return 26
-    if 21 <= anios <= 25: return 28
-    if 26 <= anios <= 30: return 30
-    return 32
+# --- CACHÉ ENTRE RERUNS ---
+# Resultados de los motores y gráficas: compartidos entre sesiones, LRU acotado por llave de entradas.
+# Stylers: LRU por sesión, porque Streamlit los muta al renderizarlos y no deben compartirse entre hilos.
+CACHE_ENTRADAS = 1024
+STYLERS_POR_SESION = 32
+
+@medido("ui/nomina_cacheada")
+@st.cache_data(max_entries=CACHE_ENTRADAS, show_spinner=False)
+def nomina_cacheada(*args):
+    return calcular_nomina_periodica(*args)
+
+@medido("ui/aguinaldo_cacheado")
+@st.cache_data(max_entries=CACHE_ENTRADAS, show_spinner=False)
+def aguinaldo_cacheado(sueldo_mensual, dias_ley, dias_trabajados, metodo, anio):
+    return calcular_aguinaldo(sueldo_mensual, dias_ley, dias_trabajados, metodo, anio)
+
+@medido("ui/dias_finiquito_cacheado")
+@st.cache_data(max_entries=CACHE_ENTRADAS, show_spinner=False)
+def dias_finiquito_cacheado(f_alta, f_baja):
+    return dias_finiquito(f_alta, f_baja)
+
+@medido("ui/finiquito_cacheado")
+@st.cache_data(max_entries=CACHE_ENTRADAS, show_spinner=False)
+def finiquito_cacheado(causa, sueldo_men, sm_aplicable, f_alta, f_baja, dias_vac_no_gozadas, anio):
+    return calcular_finiquito(causa, sueldo_men, sm_aplicable, dias_finiquito(f_alta, f_baja), dias_vac_no_gozadas, anio)
+
+@medido("ui/grafica_dona")
+@st.cache_resource(max_entries=CACHE_ENTRADAS, show_spinner=False)
+def grafica_dona(neto, isr, imss):
+    import altair as alt  # sólo la pestaña Insights grafica
+    source = pd.DataFrame({"Rubro": ["Neto", "ISR", "IMSS"], "Monto": [neto, isr, imss]})
+    base = alt.Chart(source).encode(theta=alt.Theta("Monto", stack=True))
+    return base.mark_arc(innerRadius=70, outerRadius=110).encode(
+        color=alt.Color("Rubro", scale=alt.Scale(range=['#34d399', '#60a5fa', '#fbbf24']), legend=alt.Legend(orient="bottom", titleColor="white", labelColor="white")),
+        tooltip=["Rubro", alt.Tooltip("Monto", format="$,.2f")]
+    ).configure_view(strokeWidth=0).configure(background='transparent')
+
+def tabla_formateada(filas, columnas, formato):
+    """DataFrame + Styler para una tabla pequeña; se reutiliza mientras `filas` no cambie."""
+    cache = st.session_state.setdefault("_stylers", OrderedDict())
+    clave = (tuple(map(tuple, filas)), tuple(columnas), tuple(formato.items()))
+    if clave in cache:
+        cache.move_to_end(clave)
+        return cache[clave]
+    with tramo("ui/DataFrame"): df = pd.DataFrame(filas, columns=columnas)
+    with tramo("ui/Styler.format"): styler = df.style.format(formato)
+    cache[clave] = styler
+    if len(cache) > STYLERS_POR_SESION: cache.popitem(last=False)
+    return styler
+
+# --- REGISTRO DE NÓMINA (lotes grandes) ---
+# El registro calculado, sus totales y cada vista (filtro + orden) se guardan una vez por llave;
+# al navegar sólo se toma la página visible, se formatea y se envía.
+REGISTROS_EN_CACHE = 4
+VISTAS_EN_CACHE = 32  # cada vista guarda las posiciones de hasta todo el registro (~800 KB con 100k renglones)
+DEPARTAMENTOS_EJEMPLO = ["Operaciones", "Ventas", "Administración", "Tecnología", "Logística", "Recursos Humanos"]
+COLUMNAS_REGISTRO = ["Sueldo Diario", "SBC", "Bruto", "ISR", "IMSS Obrero", "Neto", "IMSS Patronal", "ISN", "Costo Total"]
+COLUMNAS_TOTALES = ["Bruto", "ISR", "IMSS Obrero", "Neto", "IMSS Patronal", "ISN", "Costo Total"]
+
+def formatear_montos(df, columnas):
+    """Copia de `df` con `columnas` como texto "$1,234.56". Sin Styler: el envío de la tabla es ~6x más barato."""
+    return df.assign(**{c: df[c].map("${:,.2f}".format) for c in columnas})
+
+@st.cache_resource(max_entries=REGISTROS_EN_CACHE, show_spinner=False)
+def plantilla_ejemplo(n):
+    import numpy as np
+    rng = np.random.default_rng(2026)
+    return pd.DataFrame({
+        "empleado": [f"E{i:06d}" for i in range(n)],
+        "departamento": rng.choice(DEPARTAMENTOS_EJEMPLO, n),
+        "zona": np.where(rng.random(n) < 0.1, "Frontera Norte (ZLFN)", "Resto del País"),
+        "sueldo_mensual": rng.lognormal(9.9, 0.6, n).round(2),
+        "antiguedad": rng.integers(0, 30, n),
+    })
+
+@medido("ui/registro_cacheado")
+@st.cache_resource(max_entries=REGISTROS_EN_CACHE, show_spinner="Calculando registro...")
+def registro_cacheado(clave, _contenido, nombre, dias_pago, dias_mes_base, metodo_isr, periodo, zona, anio):
+    """Registro completo (identificación + resultados) de un archivo; `clave` identifica el contenido."""
+    from nomina_lote import calcular_nomina_lote
+    if _contenido is None: datos = plantilla_ejemplo(clave[1])
+    elif nombre.lower().endswith((".parquet", ".pq")): datos = pd.read_parquet(io.BytesIO(_contenido))
+    else: datos = pd.read_csv(io.BytesIO(_contenido))
+    datos = datos.reset_index(drop=True)
+    resultado = calcular_nomina_lote(datos, zona=zona, dias_pago=dias_pago, dias_mes_base=dias_mes_base,
+                                     metodo_isr=metodo_isr, periodo=periodo, anio=anio)
+    ids = pd.DataFrame({
+        "Empleado": datos["empleado"] if "empleado" in datos else datos.index + 1,
+        "Departamento": datos["departamento"] if "departamento" in datos else "Sin departamento",
+        "Zona": datos["zona"] if "zona" in datos else zona,
+    })
+    if "nombre" in datos: ids.insert(1, "Nombre", datos["nombre"])
+    # Categóricas: filtros y agrupaciones sobre códigos enteros
+    ids["Departamento"] = ids["Departamento"].astype("category")
+    ids["Zona"] = ids["Zona"].astype("category")
+    return pd.concat([ids, resultado], axis=1)
+
+@medido("ui/totales_registro")
+@st.cache_resource(max_entries=REGISTROS_EN_CACHE, show_spinner=False)
+def totales_registro(clave_registro, _registro):
+    """Totales por departamento, zona y concepto, ya formateados; una vez por registro."""
+    montos = [c for c in _registro.columns if c not in ("Sueldo Diario", "SBC") and _registro[c].dtype.kind == "f"]
+    totales = {eje: _registro.groupby(eje, observed=True)[COLUMNAS_TOTALES].sum().reset_index()
+               for eje in ("Departamento", "Zona")}
+    totales["Concepto"] = _registro[montos].sum().rename("Total").rename_axis("Concepto").reset_index()
+    return {eje: formatear_montos(df, df.columns[1:]) for eje, df in totales.items()}
+
+@medido("ui/vista_registro")
+@st.cache_data(max_entries=VISTAS_EN_CACHE, show_spinner=False)
+def vista_registro(clave_registro, _registro, departamentos, zonas, busqueda, orden, descendente):
+    """Posiciones de los renglones que pasan el filtro, en el orden pedido."""
+    import numpy as np
+    visible = np.ones(len(_registro), dtype=bool)
+    if departamentos: visible &= _registro["Departamento"].isin(departamentos).to_numpy()
+    if zonas: visible &= _registro["Zona"].isin(zonas).to_numpy()
+    if busqueda:
+        texto = _registro["Empleado"].astype(str)
+        if "Nombre" in _registro: texto = texto + " " + _registro["Nombre"].astype(str)
+        visible &= texto.str.contains(busqueda, case=False, regex=False).to_numpy()
+    posiciones = np.flatnonzero(visible)
+    if orden:
+        columna = _registro[orden]
+        valores = columna.cat.codes.to_numpy() if columna.dtype == "category" else columna.to_numpy()
+        posiciones = posiciones[np.argsort(valores[posiciones], kind="stable")]
+        if descendente: posiciones = posiciones[::-1]
+    return posiciones
+
+# Render instrumentado (sin costo si NOMINA_METRICAS está apagado: son las mismas funciones)
+mostrar_tabla = medido("ui/st.dataframe")(st.dataframe)
+mostrar_grafica = medido("ui/st.altair_chart")(st.altair_chart)
 
 # --- SIDEBAR ---
 with st.sidebar:
@@ -126,15 +178,16 @@ with st.sidebar:
     
     st.markdown("---")
     
+    anio = st.selectbox("📅 Ejercicio", sorted(VALORES_POR_ANIO, reverse=True))
     zona_geo = st.selectbox("🌍 Zona Geográfica", ["Resto del País", "Frontera Norte (ZLFN)"])
     if zona_geo == "Resto del País":
-        sm_aplicable = VALORES_2026["SALARIO_MINIMO_GENERAL"]
+        sm_aplicable = valores_anio(anio)["SALARIO_MINIMO_GENERAL"]
     else:
-        sm_aplicable = VALORES_2026["SALARIO_MINIMO_ZLFN"]
+        sm_aplicable = valores_anio(anio)["SALARIO_MINIMO_ZLFN"]
     st.caption(f"Salario Mínimo Zona: **${sm_aplicable:.2f}**")
     st.markdown("---")
     
-    modulo = st.sidebar.radio("📍 Módulo", ["Nómina Periódica", "Aguinaldo", "Finiquito y Liquidación"])
+    modulo = st.sidebar.radio("📍 Módulo", ["Nómina Periódica", "Aguinaldo", "Finiquito y Liquidación", "Registro de Nómina"])
     st.markdown("---")
 
 # ==============================================================================
@@ -145,11 +198,11 @@ if modulo == "Nómina Periódica":
         with st.container(border=True):
             st.markdown("##### ⚙️ Configuración")
             criterio = st.selectbox("Criterio Días", ["Comercial (30)", "Fiscal (30.4)"])
-            dias_mes_base = 30.0 if "Comercial" in criterio else 30.4
-            periodo = st.selectbox("Frecuencia", ["Quincenal", "Semanal", "Mensual"])
-            if periodo == "Quincenal": dias_pago = 15
-            elif periodo == "Semanal": dias_pago = 7
-            else: dias_pago = dias_mes_base
+            dias_mes_base = dias_mes_por_criterio(criterio)
+            periodo = st.selectbox("Frecuencia", ["Quincenal", "Decenal", "Semanal", "Mensual"])
+            dias_pago = dias_del_periodo(periodo, dias_mes_base)
+            metodo_isr = st.selectbox("Cálculo ISR", METODOS_ISR)
+            usa_tarifa_periodo = metodo_isr == METODOS_ISR[1]
 
         with st.container(border=True):
             st.markdown("##### 💵 Ingreso del Periodo")
@@ -175,34 +228,12 @@ if modulo == "Nómina Periódica":
         
         st.button("CALCULAR NÓMINA", type="primary", use_container_width=True)
 
-    dias_vac = obtener_dias_vacaciones_ley(antig)
-    factor_int = 1 + ((15 + (dias_vac*0.25))/365)
-    sbc = min(sueldo_diario * factor_int, VALORES_2026["UMA"] * 25)
-    bruto_periodo = sueldo_diario * dias_pago
-    imss_obrero, df_imss_obr = calcular_imss_obrero(sbc, dias_pago)
-    
-    es_salario_minimo = False
-    desglose_isr_men = {}
-    
-    if sueldo_diario <= (sm_aplicable + 1.0):
-        es_salario_minimo = True
-        isr_periodo = 0.0
-        base_mensual_proy = sueldo_diario * dias_mes_base
-        _, desglose_isr_men = calcular_isr_engine(base_mensual_proy, TABLA_ISR_MENSUAL)
-    else:
-        if es_ajuste:
-            total_ingreso_mensual = ingreso_acumulado_prev + bruto_periodo
-            isr_total_mes, desglose_isr_men = calcular_isr_engine(total_ingreso_mensual, TABLA_ISR_MENSUAL)
-            isr_periodo = isr_total_mes - isr_retenido_prev
-        else:
-            base_mensual_proy = sueldo_diario * dias_mes_base
-            isr_mensual_proy, desglose_isr_men = calcular_isr_engine(base_mensual_proy, TABLA_ISR_MENSUAL)
-            isr_periodo = isr_mensual_proy * (dias_pago / dias_mes_base)
-
-    neto = bruto_periodo - imss_obrero - isr_periodo
-    imss_patronal, df_imss_pat = calcular_imss_patronal(sbc, dias_pago, prima_riesgo)
-    isn = bruto_periodo * (tasa_isn / 100)
-    costo_total = bruto_periodo + imss_patronal + isn
+    r = nomina_cacheada(sueldo_diario, antig, prima_riesgo, tasa_isn, sm_aplicable, dias_pago, dias_mes_base,
+                        es_ajuste, ingreso_acumulado_prev, isr_retenido_prev, metodo_isr, periodo, anio)
+    bruto_periodo, isr_periodo, imss_obrero, neto = r["bruto_periodo"], r["isr_periodo"], r["imss_obrero"], r["neto"]
+    imss_patronal, isn, costo_total = r["imss_patronal"], r["isn"], r["costo_total"]
+    es_salario_minimo, desglose_isr_men = r["es_salario_minimo"], r["desglose_isr"]
+    df_imss_obr, df_imss_pat = r["conceptos_obrero"], r["conceptos_patronal"]
 
     titulo_kpi = "Nómina con Ajuste Mensual" if es_ajuste else f"Nómina: {periodo}"
     st.markdown(f"### 📊 {titulo_kpi}")
@@ -223,13 +254,8 @@ if modulo == "Nómina Periódica":
     with active_tabs[0]:
         col_g, col_i = st.columns([1, 2])
         with col_g:
-            source = pd.DataFrame({"Rubro": ["Neto", "ISR", "IMSS"], "Monto": [neto, isr_periodo, imss_obrero]})
-            base = alt.Chart(source).encode(theta=alt.Theta("Monto", stack=True))
-            pie = base.mark_arc(innerRadius=70, outerRadius=110).encode(
-                color=alt.Color("Rubro", scale=alt.Scale(range=['#34d399', '#60a5fa', '#fbbf24']), legend=alt.Legend(orient="bottom", titleColor="white", labelColor="white")),
-                tooltip=["Rubro", alt.Tooltip("Monto", format="$,.2f")]
-            ).configure_view(strokeWidth=0).configure(background='transparent')
-            st.altair_chart(pie, use_container_width=True)
+            pie = grafica_dona(neto, isr_periodo, imss_obrero)
+            mostrar_grafica(pie, use_container_width=True)
         with col_i:
             horas = dias_pago * 8
             valor_hora = neto / horas
@@ -269,18 +295,20 @@ if modulo == "Nómina Periódica":
             """, unsafe_allow_html=True)
             
             audit_data = [
-                {"Paso": "1. Base Mensual", "Monto": desglose_isr_men.get("Base Mensual", 0)},
-                {"Paso": "2. (-) Límite Inferior", "Monto": desglose_isr_men.get("Límite Inferior", 0)},
+                {"Paso": "1. Base Mensual", "Monto": desglose_isr_men.get("Límite", 0) + desglose_isr_men.get("Excedente", 0)},
+                {"Paso": "2. (-) Límite Inferior", "Monto": desglose_isr_men.get("Límite", 0)},
                 {"Paso": "3. (=) Excedente", "Monto": desglose_isr_men.get("Excedente", 0)},
                 {"Paso": f"4. (x) Tasa ({tasa_marginal:.2f}%)", "Monto": desglose_isr_men.get("Impuesto Marginal", 0)},
                 {"Paso": "5. (+) Cuota Fija", "Monto": desglose_isr_men.get("Cuota Fija", 0)},
                 {"Paso": "6. (=) ISR Mensual", "Monto": desglose_isr_men.get("ISR Determinado", 0)},
             ]
-            if not es_ajuste:
+            if usa_tarifa_periodo and not es_ajuste:
+                audit_data[0]["Paso"], audit_data[-1]["Paso"] = f"1. Base {periodo}", f"6. (=) ISR {periodo}"
+            elif not es_ajuste:
                 audit_data.append({"Paso": f"7. (x) Factor Días ({dias_pago}/{dias_mes_base})", "Monto": isr_periodo})
             
-            df_audit = pd.DataFrame(audit_data)
-            st.dataframe(df_audit.style.format({"Monto": "${:,.2f}"}), use_container_width=True, hide_index=True)
+            filas_audit = [(row["Paso"], row["Monto"]) for row in audit_data]
+            mostrar_tabla(tabla_formateada(filas_audit, ["Paso", "Monto"], {"Monto": "${:,.2f}"}), use_container_width=True, hide_index=True)
         else:
             st.info("No aplica desglose por Salario Mínimo.")
 
@@ -300,8 +328,7 @@ if modulo == "Nómina Periódica":
             </div>
         </div>
         """, unsafe_allow_html=True)
-        df_obr = pd.DataFrame(list(df_imss_obr.items()), columns=["Concepto", "Monto"])
-        st.dataframe(df_obr.style.format({"Monto": "${:,.2f}"}), use_container_width=True, hide_index=True)
+        mostrar_tabla(tabla_formateada(list(df_imss_obr.items()), ["Concepto", "Monto"], {"Monto": "${:,.2f}"}), use_container_width=True, hide_index=True)
         
     with active_tabs[3]:
         st.markdown("#### 🏢 Costo Real para la Empresa")
@@ -309,40 +336,36 @@ if modulo == "Nómina Periódica":
         with c_p1: st.metric("Sueldo Bruto", f"${bruto_periodo:,.2f}")
         with c_p2: st.metric("Carga Social", f"${imss_patronal+isn:,.2f}", delta=f"{((imss_patronal+isn)/bruto_periodo)*100:.1f}% Extra", delta_color="inverse")
         with c_p3: st.metric("Costo Total", f"${costo_total:,.2f}")
-        df_pat = pd.DataFrame(list(df_imss_pat.items()), columns=["Concepto Patronal", "Monto"])
-        df_pat.loc[len(df_pat)] = ["Impuesto Sobre Nómina (ISN)", isn]
-        st.dataframe(df_pat.style.format({"Monto": "${:,.2f}"}), use_container_width=True, hide_index=True)
+        filas_pat = list(df_imss_pat.items()) + [("Impuesto Sobre Nómina (ISN)", isn)]
+        mostrar_tabla(tabla_formateada(filas_pat, ["Concepto Patronal", "Monto"], {"Monto": "${:,.2f}"}), use_container_width=True, hide_index=True)
 
 # ==============================================================================
 # MÓDULO 2: AGUINALDO
 # ==============================================================================
 elif modulo == "Aguinaldo":
     with st.sidebar:
-        st.header("🎄 Aguinaldo 2026")
+        st.header(f"🎄 Aguinaldo {anio}")
         with st.container(border=True):
             sueldo_mensual = st.number_input("Sueldo Mensual Bruto", 15000.0, step=500.0)
             dias_ley = st.number_input("Días de Prestación (Ley=15)", 15)
+            metodo_aguinaldo = st.selectbox("Retención ISR", METODOS_AGUINALDO)
             
         with st.container(border=True):
             st.markdown("##### 🗓️ Cálculo de Días")
-            calculo_tipo = st.radio("Periodo a pagar", ["Año Completo (2026)", "Proporcional (Ingresé este año)"])
+            calculo_tipo = st.radio("Periodo a pagar", [f"Año Completo ({anio})", "Proporcional (Ingresé este año)"])
             if calculo_tipo == "Proporcional (Ingresé este año)":
-                f_ingreso_ag = st.date_input("Fecha de Ingreso", date(2026, 6, 1))
-                f_fin_anio = date(2026, 12, 31)
+                f_ingreso_ag = st.date_input("Fecha de Ingreso", date(anio, 6, 1),
+                                             min_value=date(anio, 1, 1), max_value=date(anio, 12, 31))
+                f_fin_anio = date(anio, 12, 31)
                 dias_trabajados = (f_fin_anio - f_ingreso_ag).days + 1
             else:
                 dias_trabajados = 365
                 
         st.button("CALCULAR AGUINALDO", type="primary", use_container_width=True)
 
-    sd = sueldo_mensual / 30
-    aguinaldo_bruto = (dias_trabajados/365) * dias_ley * sd
-    exento = 30 * VALORES_2026["UMA"]
-    gravado = max(0, aguinaldo_bruto - exento)
-    isr_base, _ = calcular_isr_engine(sueldo_mensual, TABLA_ISR_MENSUAL)
-    isr_total, _ = calcular_isr_engine(sueldo_mensual + gravado, TABLA_ISR_MENSUAL)
-    isr_retener = isr_total - isr_base
-    neto = aguinaldo_bruto - isr_retener
+    r = aguinaldo_cacheado(sueldo_mensual, dias_ley, dias_trabajados, metodo_aguinaldo, anio)
+    aguinaldo_bruto, exento, gravado = r["aguinaldo_bruto"], r["exento"], r["gravado"]
+    isr_retener, neto = r["isr_retener"], r["neto"]
 
     st.markdown("### 🎄 Resultado de Aguinaldo")
     k1, k2, k3 = st.columns(3)
@@ -353,14 +376,14 @@ elif modulo == "Aguinaldo":
     col_det, col_vis = st.columns([2, 1])
     with col_det:
         st.markdown("#### 📋 Desglose Fiscal")
-        df_agui = pd.DataFrame([
-            {"Concepto": "Aguinaldo Devengado", "Monto": aguinaldo_bruto},
-            {"Concepto": "(-) Exento (30 UMA)", "Monto": min(exento, aguinaldo_bruto)},
-            {"Concepto": "(=) Base Gravable", "Monto": gravado},
-            {"Concepto": "(-) ISR a Retener", "Monto": isr_retener},
-            {"Concepto": "(=) NETO A PAGAR", "Monto": neto}
-        ])
-        st.dataframe(df_agui.style.format({"Monto": "${:,.2f}"}), use_container_width=True, hide_index=True)
+        filas_agui = [
+            ("Aguinaldo Devengado", aguinaldo_bruto),
+            ("(-) Exento (30 UMA)", min(exento, aguinaldo_bruto)),
+            ("(=) Base Gravable", gravado),
+            ("(-) ISR a Retener", isr_retener),
+            ("(=) NETO A PAGAR", neto),
+        ]
+        mostrar_tabla(tabla_formateada(filas_agui, ["Concepto", "Monto"], {"Monto": "${:,.2f}"}), use_container_width=True, hide_index=True)
     with col_vis:
         st.markdown("#### 💡 ¿Sabías qué?")
         st.info(f"El SAT te 'regala' libres de impuestos hasta 30 UMAS (${exento:,.2f}).")
@@ -380,75 +403,18 @@ elif modulo == "Finiquito y Liquidación":
         with st.container(border=True):
             st.markdown("##### Prestaciones Pendientes")
             # CÁLCULO AUTOMÁTICO DE PROPORCIONALES
-            antiguedad_dias_total = (f_baja - f_alta).days + 1
-            anios_completos = int(antiguedad_dias_total / 365.25)
-            
-            # Aguinaldo Prop: Días del año en curso
-            inicio_anio_baja = date(f_baja.year, 1, 1)
-            fecha_inicio_ag = max(f_alta, inicio_anio_baja)
-            dias_ag_trab = (f_baja - fecha_inicio_ag).days + 1
-            prop_agui = (dias_ag_trab / 365) * 15 # Ley
-            
-            # Vacaciones Prop: Días desde último aniversario
-            # Fecha último aniversario:
-            fecha_aniversario = date(f_baja.year, f_alta.month, f_alta.day)
-            if fecha_aniversario > f_baja:
-                fecha_aniversario = date(f_baja.year - 1, f_alta.month, f_alta.day)
-            
-            dias_desde_aniversario = (f_baja - fecha_aniversario).days + 1
-            dias_ley_tocan = obtener_dias_vacaciones_ley(anios_completos + 1) # Del año que corre
-            prop_vac = (dias_desde_aniversario / 365) * dias_ley_tocan
-            
+            dias = dias_finiquito_cacheado(f_alta, f_baja)
+            prop_agui, prop_vac, dias_ley_tocan = dias["prop_agui"], dias["prop_vac"], dias["dias_ley_tocan"]
+
             st.info(f"🎁 Aguinaldo Prop: {prop_agui:.2f} días")
             st.info(f"🏖️ Vacaciones Prop: {prop_vac:.2f} días ({dias_ley_tocan} ley)")
             
             dias_vac_no_gozadas = st.number_input("Días Vacaciones Años Anteriores (No gozadas)", value=0.0)
-            total_dias_vac = prop_vac + dias_vac_no_gozadas
 
         st.button("CALCULAR LIQUIDACIÓN", type="primary", use_container_width=True)
 
-    sd = sueldo_men / 30
-    factor_int = 1 + ((15 + (dias_ley_tocan*0.25))/365)
-    sdi = sd * factor_int
-
-    monto_aguinaldo = prop_agui * sd
-    monto_vac = total_dias_vac * sd
-    monto_prima_vac = monto_vac * 0.25
-    
-    tope_prima = 2 * sm_aplicable
-    base_prima = min(sd, tope_prima)
-    prima_antiguedad = 0
-    if causa == "Despido Injustificado" or anios_completos >= 15:
-        prima_antiguedad = (antiguedad_dias_total / 365) * 12 * base_prima
-
-    indemnizacion = 0
-    veinte_dias = 0
-    if causa == "Despido Injustificado":
-        indemnizacion = 3 * 30 * sdi
-        veinte_dias = 20 * (antiguedad_dias_total / 365) * sdi
-
-    # IMPUESTOS
-    _, desglose_isr_men = calcular_isr_engine(sueldo_men, TABLA_ISR_MENSUAL)
-    tasa_marginal = desglose_isr_men["Tasa (%)"]
-
-    ex_agui = min(monto_aguinaldo, 30*VALORES_2026["UMA"])
-    ex_pv = min(monto_prima_vac, 15*VALORES_2026["UMA"])
-    tope_90_umas = 90 * VALORES_2026["UMA"] * anios_completos
-    total_separacion = prima_antiguedad + indemnizacion + veinte_dias
-    ex_separacion = min(total_separacion, tope_90_umas)
-    
-    # ISR Finiquito (Simplificado)
-    isr_finiquito = ((monto_aguinaldo - ex_agui) + (monto_prima_vac - ex_pv) + monto_vac) * tasa_marginal
-    
-    # ISR Liquidación (Tasa Efectiva)
-    gravado_sep = total_separacion - ex_separacion
-    isr_ord_men, _ = calcular_isr_engine(sueldo_men, TABLA_ISR_MENSUAL)
-    tasa_efectiva = isr_ord_men / sueldo_men if sueldo_men > 0 else 0
-    isr_separacion = gravado_sep * tasa_efectiva
-    
-    total_pagar = total_separacion + monto_aguinaldo + monto_vac + monto_prima_vac
-    total_isr = isr_finiquito + isr_separacion
-    total_neto = total_pagar - total_isr
+    r = finiquito_cacheado(causa, sueldo_men, sm_aplicable, f_alta, f_baja, dias_vac_no_gozadas, anio)
+    total_pagar, total_isr, total_neto = r["total_pagar"], r["total_isr"], r["total_neto"]
 
     st.markdown(f"### ⚖️ Hoja de Liquidación: {causa}")
     k1, k2, k3 = st.columns(3)
@@ -459,14 +425,88 @@ elif modulo == "Finiquito y Liquidación":
     st.markdown("<br>", unsafe_allow_html=True)
     st.markdown("#### 📋 Desglose Detallado por Concepto")
     
-    detalle_data = [
-        {"Concepto": "Aguinaldo Proporcional", "Bruto": monto_aguinaldo, "Exento": ex_agui, "ISR Aprox": (monto_aguinaldo-ex_agui)*tasa_marginal},
-        {"Concepto": "Vacaciones (Prop + Pend)", "Bruto": monto_vac, "Exento": 0, "ISR Aprox": monto_vac*tasa_marginal},
-        {"Concepto": "Prima Vacacional", "Bruto": monto_prima_vac, "Exento": ex_pv, "ISR Aprox": (monto_prima_vac-ex_pv)*tasa_marginal},
-    ]
-    if total_separacion > 0:
-        detalle_data.append({"Concepto": "Pagos por Separación (Liq + Antig)", "Bruto": total_separacion, "Exento": ex_separacion, "ISR Aprox": isr_separacion})
-
-    df_detalle = pd.DataFrame(detalle_data)
-    df_detalle["Neto"] = df_detalle["Bruto"] - df_detalle["ISR Aprox"]
-    st.dataframe(df_detalle.style.format({"Bruto": "${:,.2f}", "Exento": "${:,.2f}", "ISR Aprox": "${:,.2f}", "Neto": "${:,.2f}"}), use_container_width=True, hide_index=True)
+    formato_detalle = {"Bruto": "${:,.2f}", "Exento": "${:,.2f}", "ISR Aprox": "${:,.2f}", "Neto": "${:,.2f}"}
+    columnas_detalle = ["Concepto", "Bruto", "Exento", "ISR Aprox", "Neto"]
+    filas_detalle = [[row[c] for c in columnas_detalle] for row in r["detalle"]]
+    mostrar_tabla(tabla_formateada(filas_detalle, columnas_detalle, formato_detalle), use_container_width=True, hide_index=True)
+
+# ==============================================================================
+# MÓDULO 4: REGISTRO DE NÓMINA
+# ==============================================================================
+elif modulo == "Registro de Nómina":
+    with st.sidebar:
+        st.header("🗂️ Registro de Nómina")
+        with st.container(border=True):
+            archivo = st.file_uploader("Empleados (CSV o Parquet)", type=["csv", "parquet"],
+                                       help="Mismas columnas que la CLI; opcionales empleado, nombre y departamento.")
+            if archivo is None:
+                n_ejemplo = st.select_slider("Plantilla de ejemplo", [1_000, 10_000, 100_000], value=100_000)
+        with st.container(border=True):
+            st.markdown("##### ⚙️ Configuración")
+            criterio = st.selectbox("Criterio Días", ["Comercial (30)", "Fiscal (30.4)"])
+            dias_mes_base = dias_mes_por_criterio(criterio)
+            periodo = st.selectbox("Frecuencia", ["Quincenal", "Decenal", "Semanal", "Mensual"])
+            dias_pago = dias_del_periodo(periodo, dias_mes_base)
+            metodo_isr = st.selectbox("Cálculo ISR", METODOS_ISR)
+
+    if archivo is None: clave, contenido, nombre = ("ejemplo", n_ejemplo), None, ""
+    else: clave, contenido, nombre = ("archivo", archivo.file_id), archivo.getvalue(), archivo.name
+    clave_registro = (clave, dias_pago, dias_mes_base, metodo_isr, periodo, zona_geo, anio)
+    registro = registro_cacheado(clave, contenido, nombre, dias_pago, dias_mes_base, metodo_isr, periodo, zona_geo, anio)
+    totales = totales_registro(clave_registro, registro)
+
+    st.markdown(f"### 🗂️ Registro de Nómina: {periodo} ({len(registro):,} empleados)")
+    f1, f2, f3 = st.columns([2, 2, 3])
+    with f1: departamentos = st.multiselect("Departamento", list(registro["Departamento"].cat.categories))
+    with f2: zonas = st.multiselect("Zona", list(registro["Zona"].cat.categories))
+    with f3: busqueda = st.text_input("Buscar empleado", placeholder="Número o nombre").strip()
+    o1, o2, o3, o4 = st.columns([3, 2, 2, 2])
+    columnas_orden = [c for c in registro.columns if c not in ("Salario Mínimo", "Ajuste")]
+    with o1: orden = st.selectbox("Ordenar por", ["(Sin orden)", *columnas_orden])
+    with o2: descendente = st.toggle("Descendente", value=True)
+    with o3: por_pagina = st.selectbox("Renglones por página", [50, 100, 250, 500], index=1)
+    with o4: detalle_imss = st.toggle("Conceptos IMSS", value=False)
+
+    posiciones = vista_registro(clave_registro, registro, tuple(departamentos), tuple(zonas), busqueda,
+                                None if orden == "(Sin orden)" else orden, descendente)
+    paginas = max(1, -(-len(posiciones) // por_pagina))
+    with tramo("ui/sumas_vista"):
+        suma = {c: registro[c].to_numpy()[posiciones].sum() for c in ("Bruto", "Neto", "Costo Total")}
+
+    k1, k2, k3, k4 = st.columns(4)
+    with k1: st.markdown(f"""<div class="dark-card"><div class="kpi-label">Empleados</div><div class="kpi-value">{len(posiciones):,}</div></div>""", unsafe_allow_html=True)
+    with k2: st.markdown(f"""<div class="dark-card"><div class="kpi-label">Bruto</div><div class="kpi-value">${suma["Bruto"]:,.0f}</div></div>""", unsafe_allow_html=True)
+    with k3: st.markdown(f"""<div class="dark-card" style="border: 1px solid #34d399;"><div class="kpi-label neon-green">Neto</div><div class="kpi-value neon-green">${suma["Neto"]:,.0f}</div></div>""", unsafe_allow_html=True)
+    with k4: st.markdown(f"""<div class="dark-card"><div class="kpi-label">Costo Total</div><div class="kpi-value neon-gold">${suma["Costo Total"]:,.0f}</div></div>""", unsafe_allow_html=True)
+    st.markdown("<br>", unsafe_allow_html=True)
+
+    tabs_registro = st.tabs(["📋 Registro", "🏢 Por Departamento", "🌍 Por Zona", "🧾 Por Concepto"])
+    with tabs_registro[0]:
+        if len(posiciones) == 0:
+            st.info("Ningún empleado coincide con el filtro.")
+        else:
+            # La llave cambia con la vista: un filtro u orden nuevo regresa a la página 1
+            vista = (clave_registro, tuple(departamentos), tuple(zonas), busqueda, orden, descendente, por_pagina)
+            pagina = st.number_input(f"Página (de {paginas:,})", min_value=1, max_value=paginas, value=1, step=1,
+                                     key=f"pagina_registro_{hash(vista)}")
+            ids = [c for c in ("Empleado", "Nombre", "Departamento", "Zona") if c in registro]
+            montos = [c for c in registro.columns if c.startswith(("Obrero: ", "Patronal: "))] if detalle_imss else []
+            columnas = ids + COLUMNAS_REGISTRO + montos
+            # Sólo la página visible se toma del registro, se formatea y se envía al navegador
+            with tramo("ui/pagina_registro"):
+                visibles = posiciones[(pagina - 1) * por_pagina:pagina * por_pagina]
+                tabla_pagina = formatear_montos(registro.iloc[visibles][columnas], columnas[len(ids):])
+            mostrar_tabla(tabla_pagina, use_container_width=True, hide_index=True)
+            st.caption(f"Renglones {(pagina - 1) * por_pagina + 1:,}–{(pagina - 1) * por_pagina + len(visibles):,} de {len(posiciones):,}")
+    for tab, eje in zip(tabs_registro[1:], ("Departamento", "Zona", "Concepto")):
+        with tab: mostrar_tabla(totales[eje], use_container_width=True, hide_index=True)
+
+# --- PANEL DE MÉTRICAS (oculto: NOMINA_METRICAS=1 y ?debug=metricas) ---
+resumen_rerun = terminar_rerun(modulo)
+if resumen_rerun and st.query_params.get("debug") == "metricas":
+    with st.sidebar.expander("⏱️ Métricas del Rerun", expanded=True):
+        st.caption(f"Total: **{resumen_rerun['total_s']*1000:,.1f} ms**")
+        filas_met = [(nombre, llamadas, seg*1000) for nombre, (llamadas, seg) in resumen_rerun["tramos"].items()]
+        st.dataframe(pd.DataFrame(filas_met, columns=["Tramo", "Llamadas", "ms"]).style.format({"ms": "{:,.2f}"}),
+                     use_container_width=True, hide_index=True)
+        st.download_button("Acumulado (Prometheus)", REGISTRO.texto_prometheus(), "nominapp.prom", "text/plain")